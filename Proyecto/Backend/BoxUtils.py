@@ -0,0 +1,117 @@
+import numpy as np
+
+
+def as_boxes(boxes):
+    """Convierte una lista de bounding boxes [x1, y1, x2, y2] en un arreglo N×4 de float."""
+    return np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+
+
+def box_areas(boxes):
+    return np.clip(boxes[:, 2] - boxes[:, 0], 0, None) * np.clip(boxes[:, 3] - boxes[:, 1], 0, None)
+
+
+def iou_one_to_many(box, boxes):
+    """IoU entre una bounding box y cada fila de un arreglo N×4 (vectorizado)."""
+    boxes = as_boxes(boxes)
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.float32)
+    box = as_boxes(box)[0]
+
+    inter_w = np.clip(np.minimum(box[2], boxes[:, 2]) - np.maximum(box[0], boxes[:, 0]), 0, None)
+    inter_h = np.clip(np.minimum(box[3], boxes[:, 3]) - np.maximum(box[1], boxes[:, 1]), 0, None)
+    inter_area = inter_w * inter_h
+    union_area = box_areas(box[None, :])[0] + box_areas(boxes) - inter_area
+    return np.divide(inter_area, union_area, out=np.zeros_like(inter_area), where=union_area > 0)
+
+
+def ios_one_to_many(box, boxes):
+    """
+    Intersección sobre el área de la menor de las dos cajas (IoS). Vale 1 si
+    una caja contiene a la otra, así que detecta los recortes parciales de
+    un mismo objeto que el IoU no empareja.
+    """
+    boxes = as_boxes(boxes)
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.float32)
+    box = as_boxes(box)[0]
+
+    inter_w = np.clip(np.minimum(box[2], boxes[:, 2]) - np.maximum(box[0], boxes[:, 0]), 0, None)
+    inter_h = np.clip(np.minimum(box[3], boxes[:, 3]) - np.maximum(box[1], boxes[:, 1]), 0, None)
+    inter_area = inter_w * inter_h
+    smaller_area = np.minimum(box_areas(box[None, :])[0], box_areas(boxes))
+    return np.divide(inter_area, smaller_area, out=np.zeros_like(inter_area), where=smaller_area > 0)
+
+
+def nms(boxes, scores, threshold=0.5):
+    """
+    Supresión de no máximos greedy: recorre las cajas de mayor a menor
+    puntaje y descarta las que tienen IoU > threshold con una ya conservada.
+    Devuelve los índices conservados, de mayor a menor puntaje.
+    """
+    boxes = as_boxes(boxes)
+    order = np.argsort(-np.asarray(scores, dtype=np.float32), kind='stable')
+    keep = []
+    while order.size:
+        best, rest = order[0], order[1:]
+        keep.append(int(best))
+        order = rest[iou_one_to_many(boxes[best], boxes[rest]) <= threshold]
+    return keep
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """Matriz N×M con el IoU entre cada bounding box de `boxes_a` y cada una de `boxes_b`."""
+    boxes_a = as_boxes(boxes_a)
+    boxes_b = as_boxes(boxes_b)
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return np.zeros((len(boxes_a), len(boxes_b)), dtype=np.float32)
+
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    inter = np.clip(bottom_right - top_left, 0, None)
+    inter_area = inter[..., 0] * inter[..., 1]
+    union_area = box_areas(boxes_a)[:, None] + box_areas(boxes_b)[None, :] - inter_area
+    return np.divide(inter_area, union_area, out=np.zeros_like(inter_area), where=union_area > 0)
+
+
+def greedy_match(iou, threshold):
+    """
+    Emparejamiento uno a uno sobre una matriz de IoU: toma primero los pares
+    con mayor IoU. Devuelve una lista de pares (fila, columna) con IoU > threshold.
+    """
+    if iou.size == 0:
+        return []
+    rows, cols = np.nonzero(iou > threshold)
+    order = np.argsort(-iou[rows, cols], kind='stable')
+
+    matches = []
+    used_rows, used_cols = set(), set()
+    for row, col in zip(rows[order].tolist(), cols[order].tolist()):
+        if row in used_rows or col in used_cols:
+            continue
+        used_rows.add(row)
+        used_cols.add(col)
+        matches.append((row, col))
+    return matches
+
+
+def hungarian_match(iou, threshold):
+    """
+    Emparejamiento óptimo (algoritmo húngaro) que maximiza el IoU total.
+    Usa scipy si está disponible; si no, recurre a greedy_match.
+    """
+    if iou.size == 0:
+        return []
+    try:
+        from scipy.optimize import linear_sum_assignment
+    except ImportError:
+        return greedy_match(iou, threshold)
+
+    rows, cols = linear_sum_assignment(-iou)
+    return [(row, col) for row, col in zip(rows.tolist(), cols.tolist()) if iou[row, col] > threshold]
+
+
+def match_boxes(iou, threshold, method='greedy'):
+    """Empareja filas y columnas de una matriz de IoU con el método indicado ('greedy' o 'hungarian')."""
+    if method == 'hungarian':
+        return hungarian_match(iou, threshold)
+    return greedy_match(iou, threshold)
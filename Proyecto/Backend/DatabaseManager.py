@@ -1,28 +1,144 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Enum
+import json
+import threading
+from sqlalchemy import Column, Integer, String, DateTime, Enum, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.associationproxy import association_proxy
 from enum import Enum as PyEnum
 
 # Inicialización de SQLAlchemy
 db = SQLAlchemy()
 
+
+# Tabla de búsqueda "sources": cada archivo o cámara se guarda una sola vez
+class Source(db.Model):
+    __tablename__ = 'sources'
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(256), nullable=False, default='')
+    location = db.Column(db.String(512), nullable=False, default='')
+
+    __table_args__ = (
+        db.UniqueConstraint('filename', 'location', name='uq_sources_filename_location'),
+    )
+
+    def __repr__(self):
+        return f"<Source {self.filename} ({self.location})>"
+
+
 # Definición de la tabla "detections"
 class Detection(db.Model):
     __tablename__ = 'detections'
     id = db.Column(db.Integer, primary_key=True)
-    filename = db.Column(db.String(256))
-    location = db.Column(db.String(512))
+    source_id = db.Column(db.Integer, db.ForeignKey('sources.id'), nullable=False)
     vehicle_type = db.Column(db.String(64))
     confidence = db.Column(db.Float)
     timestamp = db.Column(db.DateTime)
     processing_time = db.Column(db.Float)
     processed = db.Column(db.Boolean)
-    bbox = db.Column(db.String)  # Guarda las coordenadas como una cadena JSON
+    # Caja delimitadora (x1, y1, x2, y2) en píxeles
+    x1 = db.Column(db.Float)
+    y1 = db.Column(db.Float)
+    x2 = db.Column(db.Float)
+    y2 = db.Column(db.Float)
+
+    source = db.relationship(Source, lazy='joined')
+    filename = association_proxy('source', 'filename')
+    location = association_proxy('source', 'location')
+
+    __table_args__ = (
+        # Filtros y orden por fecha (/detections, búsquedas, reportes, borrado)
+        db.Index('ix_detections_timestamp_id', 'timestamp', 'id'),
+        # Duplicados y consultas por origen y tipo de vehículo
+        db.Index('ix_detections_source_type_timestamp', 'source_id', 'vehicle_type', 'timestamp'),
+    )
+
+    @property
+    def bbox(self):
+        """Caja como lista [x1, y1, x2, y2], o None si no se guardó."""
+        if self.x1 is None:
+            return None
+        return [self.x1, self.y1, self.x2, self.y2]
+
+    @staticmethod
+    def row(filename=None, location=None, bbox=None, **columns):
+        """
+        Convierte una detección con filename/location/bbox en una fila de la
+        tabla (source_id y x1..y2), lista para un INSERT en bloque.
+        """
+        columns['source_id'] = get_source_id(filename, location)
+        columns.update(bbox_columns(bbox))
+        return columns
 
     def __repr__(self):
         return f"<Detection {self.vehicle_type} ({self.confidence})>"
 
 
+# Conteos agregados de detecciones por intervalo, origen y tipo de vehículo
+class DetectionRollup(db.Model):
+    __tablename__ = 'detection_rollups'
+    granularity = db.Column(db.String(8), primary_key=True)  # 'minute', 'hour' o 'day'
+    bucket = db.Column(db.DateTime, primary_key=True)  # Inicio del intervalo (hora local del servidor)
+    source_id = db.Column(db.Integer, db.ForeignKey('sources.id'), primary_key=True)
+    vehicle_type = db.Column(db.String(64), primary_key=True)
+    detection_count = db.Column(db.Integer, nullable=False, default=0)
+    confidence_sum = db.Column(db.Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<DetectionRollup {self.granularity} {self.bucket} {self.vehicle_type}: {self.detection_count}>"
+
+
+def parse_bbox(bbox):
+    """Normaliza una caja (lista, tupla o texto '[x1, y1, x2, y2]') a 4 floats, o None."""
+    if bbox is None or bbox == '':
+        return None
+    if isinstance(bbox, str):
+        bbox = json.loads(bbox)
+    values = [float(v) for v in bbox]
+    if len(values) != 4:
+        raise ValueError(f'Caja inválida: {bbox}')
+    return tuple(values)
+
+
+def bbox_columns(bbox):
+    """Columnas x1, y1, x2, y2 de una caja (None si no hay caja)."""
+    values = parse_bbox(bbox) or (None, None, None, None)
+    return dict(zip(('x1', 'y1', 'x2', 'y2'), values))
+
+
+_source_ids = {}
+_source_lock = threading.Lock()
+
+
+def get_source_id(filename, location):
+    """
+    Id de `sources` para (filename, location); la crea si no existe.
+
+    Se inserta en una conexión y transacción propias (INSERT ... ON CONFLICT
+    DO NOTHING), así el id es válido aunque la sesión del llamador haga
+    rollback, y se guarda en memoria para no consultar en cada fila.
+    """
+    key = (filename or '', location or '')
+    source_id = _source_ids.get(key)
+    if source_id is not None:
+        return source_id
+
+    with _source_lock:
+        source_id = _source_ids.get(key)
+        if source_id is None:
+            with db.engine.begin() as connection:
+                connection.execute(
+                    pg_insert(Source.__table__)
+                    .values(filename=key[0], location=key[1])
+                    .on_conflict_do_nothing(index_elements=['filename', 'location'])
+                )
+                source_id = connection.execute(
+                    select(Source.id).where(Source.filename == key[0], Source.location == key[1])
+                ).scalar_one()
+            _source_ids[key] = source_id
+    return source_id
+
+
 #guardas imagenes
 
     
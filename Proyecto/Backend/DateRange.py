@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+DATE_FORMAT = '%Y-%m-%d'
+
+
+def parse_timezone(name):
+    """Zona horaria IANA ('America/Lima', 'UTC'); None para la hora local del servidor."""
+    if not name:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f'Zona horaria desconocida: {name}')
+
+
+def parse_datetime(value, tz=None, is_end=False):
+    """
+    Convierte 'YYYY-MM-DD' o una fecha/hora ISO 8601 en un datetime sin zona
+    en hora local del servidor, que es como se guarda `timestamp`.
+
+    Una fecha sin hora usada como fin incluye el día completo: se devuelve
+    el inicio del día siguiente, que es el límite excluido del rango.
+    """
+    value = value.strip()
+    try:
+        if len(value) == 10:
+            parsed = datetime.strptime(value, DATE_FORMAT)
+            if is_end:
+                parsed += timedelta(days=1)
+        else:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f'Fecha inválida "{value}". Use YYYY-MM-DD o YYYY-MM-DDTHH:MM:SS.')
+
+    if parsed.tzinfo is None and tz is not None:
+        parsed = parsed.replace(tzinfo=tz)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def parse_date_range(fecha=None, start=None, end=None, tz=None):
+    """
+    Rango semiabierto [inicio, fin) para filtrar por `timestamp`.
+
+    `fecha` es un día completo; `start`/`end` permiten rangos arbitrarios
+    (cualquiera de los dos puede faltar). `tz` es el nombre de la zona
+    horaria en que se expresan las fechas. Lanza ValueError si algún valor
+    es inválido.
+    """
+    tz = parse_timezone(tz)
+    if fecha:
+        start, end = fecha, fecha
+    range_start = parse_datetime(start, tz) if start else None
+    range_end = parse_datetime(end, tz, is_end=True) if end else None
+    if range_start and range_end and range_start >= range_end:
+        raise ValueError('La fecha inicial debe ser anterior a la final.')
+    return range_start, range_end
+
+
+def date_range_from(params):
+    """Rango a partir de los parámetros 'fecha', 'start'/'end' (o 'start_date'/'end_date') y 'tz'."""
+    return parse_date_range(
+        fecha=params.get('fecha'),
+        start=params.get('start') or params.get('start_date'),
+        end=params.get('end') or params.get('end_date'),
+        tz=params.get('tz')
+    )
+
+
+def apply_date_range(query, column, date_range):
+    """Filtra `query` con `column >= inicio AND column < fin`, que puede usar el índice de la columna."""
+    start, end = date_range
+    if start is not None:
+        query = query.filter(column >= start)
+    if end is not None:
+        query = query.filter(column < end)
+    return query
@@ -0,0 +1,142 @@
+import math
+from collections import defaultdict
+
+import numpy as np
+
+from BoxUtils import as_boxes, iou_one_to_many
+
+
+class DedupIndex:
+    """
+    Índice en memoria para descartar detecciones duplicadas de un stream
+    (un video o una cámara) sin consultar la base de datos.
+
+    Las detecciones aceptadas se guardan por tipo de vehículo en cubetas de
+    `bucket_seconds`. Una detección es duplicada si existe otra del mismo
+    tipo a menos de `time_threshold` segundos con IoU mayor que
+    `iou_threshold`; el IoU se calcula vectorizado contra toda la ventana.
+    Las cubetas que quedan fuera de la ventana se descartan a medida que
+    avanza el tiempo, así que la memoria no crece con la duración del stream.
+    """
+
+    def __init__(self, iou_threshold=0.5, time_threshold=1.0, bucket_seconds=1.0):
+        self.iou_threshold = iou_threshold
+        self.time_threshold = time_threshold
+        self.bucket_seconds = bucket_seconds
+        # vehicle_type -> {cubeta -> ([bbox], [timestamp])}
+        self._buckets = defaultdict(dict)
+        self._newest = None
+
+    def _bucket(self, seconds):
+        return math.floor(seconds / self.bucket_seconds)
+
+    def is_duplicate(self, vehicle_type, bbox, timestamp):
+        seconds = timestamp.timestamp()
+        buckets = self._buckets.get(vehicle_type)
+        if not buckets:
+            return False
+
+        boxes, times = [], []
+        for bucket in range(self._bucket(seconds - self.time_threshold),
+                            self._bucket(seconds + self.time_threshold) + 1):
+            entry = buckets.get(bucket)
+            if entry:
+                boxes.extend(entry[0])
+                times.extend(entry[1])
+        if not boxes:
+            return False
+
+        in_window = np.abs(np.asarray(times) - seconds) <= self.time_threshold
+        if not in_window.any():
+            return False
+        ious = iou_one_to_many(bbox, as_boxes(boxes)[in_window])
+        return bool((ious > self.iou_threshold).any())
+
+    def add(self, vehicle_type, bbox, timestamp):
+        seconds = timestamp.timestamp()
+        entry = self._buckets[vehicle_type].setdefault(self._bucket(seconds), ([], []))
+        entry[0].append(bbox)
+        entry[1].append(seconds)
+
+        if self._newest is None or seconds > self._newest:
+            self._newest = seconds
+            self._evict()
+
+    def check_and_add(self, vehicle_type, bbox, timestamp):
+        """Registra la detección si no es duplicada. Devuelve True si se registró."""
+        if self.is_duplicate(vehicle_type, bbox, timestamp):
+            return False
+        self.add(vehicle_type, bbox, timestamp)
+        return True
+
+    def _evict(self):
+        oldest_bucket = self._bucket(self._newest - self.time_threshold) - 1
+        for buckets in self._buckets.values():
+            for bucket in [b for b in buckets if b < oldest_bucket]:
+                del buckets[bucket]
+
+    def __len__(self):
+        return sum(len(entry[0]) for buckets in self._buckets.values() for entry in buckets.values())
+
+
+class DetectionWindow:
+    """
+    Ventana deslizante acotada de detecciones recientes, ordenada por tiempo.
+
+    Guarda las bounding boxes en un buffer circular de NumPy, de modo que las
+    consultas de IoU trabajan sobre un arreglo sin reconstruir listas. Las
+    entradas con `ttl` segundos o más se descartan desde el inicio en
+    O(expiradas); si se supera `max_size`, se descartan las más antiguas.
+    """
+
+    def __init__(self, ttl=5.0, max_size=4096, initial_capacity=64):
+        self.ttl = ttl
+        self.max_size = max_size
+        capacity = min(initial_capacity, max_size)
+        self._boxes = np.zeros((capacity, 4), dtype=np.float32)
+        self._times = np.zeros(capacity, dtype=np.float64)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _index(self, offset):
+        return (self._start + offset) % len(self._times)
+
+    def _grow(self):
+        capacity = len(self._times)
+        new_capacity = min(capacity * 2, self.max_size)
+        order = [self._index(i) for i in range(self._size)]
+        boxes = np.zeros((new_capacity, 4), dtype=np.float32)
+        times = np.zeros(new_capacity, dtype=np.float64)
+        boxes[:self._size] = self._boxes[order]
+        times[:self._size] = self._times[order]
+        self._boxes, self._times, self._start = boxes, times, 0
+
+    def evict(self, now):
+        """Descarta las entradas con `ttl` segundos o más de antigüedad."""
+        cutoff = now - self.ttl
+        while self._size and self._times[self._start] <= cutoff:
+            self._start = self._index(1)
+            self._size -= 1
+
+    def add(self, bbox, timestamp):
+        if self._size == len(self._times):
+            if len(self._times) < self.max_size:
+                self._grow()
+            else:
+                # Ventana llena: se descarta la entrada más antigua
+                self._start = self._index(1)
+                self._size -= 1
+        position = self._index(self._size)
+        self._boxes[position] = bbox
+        self._times[position] = timestamp
+        self._size += 1
+
+    def boxes(self):
+        """Arreglo N×4 con las bounding boxes vigentes (de la más antigua a la más reciente)."""
+        end = self._start + self._size
+        if end <= len(self._times):
+            return self._boxes[self._start:end]
+        return np.concatenate([self._boxes[self._start:], self._boxes[:end - len(self._times)]])
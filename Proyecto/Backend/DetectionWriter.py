@@ -0,0 +1,114 @@
+from time import monotonic
+
+from DatabaseManager import db, Detection
+from TrafficRollups import update_rollups
+
+
+class DetectionWriter:
+    """
+    Acumula filas de `Detection` en memoria y las inserta en bloque.
+
+    Se vacía cuando el búfer llega a `batch_size` filas o cuando pasaron
+    `flush_interval` segundos desde el último vaciado. Cada vaciado es un
+    único INSERT (executemany) más la actualización de los agregados de
+    tráfico, dentro de una sola transacción. Debe llamarse a `close()` al
+    terminar el trabajo para escribir lo pendiente.
+
+    Si la base de datos falla, las filas se conservan y el reintento se
+    espacia con backoff exponencial (`flush_interval`, el doble, ... hasta
+    `max_backoff` segundos) en lugar de repetirse en cada `add()`. El búfer
+    tiene un tope de `max_buffer` filas: al superarlo se descartan las más
+    antiguas y se cuentan en `dropped`. `failed`, `last_error` y `status()`
+    exponen el estado al trabajo o stream que usa el escritor.
+
+    No es seguro compartir una instancia entre hilos: cada trabajo o stream
+    usa su propio escritor.
+    """
+
+    def __init__(self, batch_size=500, flush_interval=2.0, max_buffer=None, max_backoff=60.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer or batch_size * 10
+        self.max_backoff = max_backoff
+        self.rows = []
+        self.total_written = 0
+        self.dropped = 0
+        self.failures = 0  # Vaciados fallidos seguidos
+        self.last_error = None
+        self._last_flush = monotonic()
+        self._retry_at = None
+
+    @property
+    def failed(self):
+        """La última escritura falló y las filas pendientes esperan un reintento."""
+        return self.failures > 0
+
+    def add(self, **row):
+        """
+        Agrega una fila (columnas de Detection, con filename/location/bbox en
+        lugar de source_id y x1..y2) y vacía si se alcanzó un umbral.
+        """
+        self.rows.append(Detection.row(**row))
+        excess = len(self.rows) - self.max_buffer
+        if excess > 0:
+            del self.rows[:excess]
+            self.dropped += excess
+            print(f"Búfer de detecciones lleno: se descartaron {excess} filas antiguas ({self.dropped} en total)")
+        self.flush_if_due()
+
+    def flush_if_due(self):
+        """Vacía si se alcanzó un umbral; tras un fallo, solo cuando vence el backoff."""
+        now = monotonic()
+        if self.failed:
+            due = now >= self._retry_at
+        else:
+            due = len(self.rows) >= self.batch_size or now - self._last_flush >= self.flush_interval
+        return self.flush() if due else 0
+
+    def flush(self):
+        """
+        Inserta todas las filas pendientes en una transacción. Devuelve
+        cuántas se escribieron. Si la escritura falla, las filas siguen en
+        el búfer, se programa el reintento y se relanza la excepción.
+        """
+        self._last_flush = monotonic()
+        if not self.rows:
+            return 0
+
+        rows = self.rows
+        try:
+            db.session.execute(Detection.__table__.insert(), rows)
+            update_rollups(rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            self.failures += 1
+            self.last_error = str(e)
+            self._retry_at = self._last_flush + min(self.flush_interval * 2 ** (self.failures - 1), self.max_backoff)
+            raise
+        self.rows = []
+        self.failures = 0
+        self.last_error = None
+        self._retry_at = None
+        self.total_written += len(rows)
+        return len(rows)
+
+    def status(self):
+        """Estado del escritor para el estado del trabajo o stream."""
+        return {
+            'written': self.total_written,
+            'pending': len(self.rows),
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'last_error': self.last_error,
+        }
+
+    def close(self):
+        """Vaciado final al terminar el trabajo."""
+        return self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
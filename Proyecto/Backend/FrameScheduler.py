@@ -0,0 +1,159 @@
+import math
+
+import cv2
+import numpy as np
+
+
+def downscale_gray(frame, size=(64, 36)):
+    """Versión diminuta en escala de grises del cuadro, para comparaciones baratas."""
+    return cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), size, interpolation=cv2.INTER_AREA)
+
+
+def motion_score(previous_small, small):
+    """Diferencia media absoluta entre dos cuadros reducidos, normalizada a [0, 1]."""
+    if previous_small is None:
+        return 1.0
+    return float(np.mean(cv2.absdiff(previous_small, small))) / 255.0
+
+
+class RateController:
+    """
+    Decide qué cuadros se envían a inferencia.
+
+    El paso base es `source_fps / target_fps` (o `default_stride` si no se
+    conocen los FPS). En modo `realtime` el paso también crece con la
+    latencia medida de inferencia, para que el consumo siga el ritmo de la
+    cámara sin ajustes manuales. Los cuadros omitidos se descartan con
+    `cap.grab()`, sin decodificarlos.
+
+    Si `motion_threshold` está definido, cada cuadro procesado se compara con
+    el anterior; cuando la diferencia supera el umbral se procesan los
+    siguientes `burst_frames` cuadros con el paso mínimo que permite la
+    latencia.
+    """
+
+    def __init__(self, source_fps=None, target_fps=None, realtime=False, default_stride=3, max_stride=60,
+                 motion_threshold=None, burst_frames=0, smoothing=0.2):
+        self.source_fps = source_fps if source_fps and source_fps > 0 else None
+        self.target_fps = target_fps if target_fps and target_fps > 0 else None
+        self.realtime = realtime
+        self.default_stride = default_stride
+        self.max_stride = max_stride
+        self.motion_threshold = motion_threshold
+        self.burst_frames = burst_frames
+        self.smoothing = smoothing
+        self.latency = None
+        self.processed = 0
+        self.skipped = 0
+        self.bursts = 0
+        self._last_index = None
+        self._burst_left = 0
+        self._previous_small = None
+
+    def _clamp(self, stride):
+        return min(max(int(math.ceil(stride - 1e-6)), 1), self.max_stride)
+
+    def _latency_stride(self):
+        if self.realtime and self.latency and self.source_fps:
+            return self.source_fps * self.latency
+        return 1
+
+    @property
+    def stride(self):
+        if self._burst_left > 0:
+            return self._clamp(self._latency_stride())
+        if self.source_fps and self.target_fps:
+            base = self.source_fps / self.target_fps
+        else:
+            base = self.default_stride
+        return self._clamp(max(base, self._latency_stride()))
+
+    def record_latency(self, seconds):
+        """Registra la latencia de inferencia por cuadro (media móvil exponencial)."""
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency = (1 - self.smoothing) * self.latency + self.smoothing * seconds
+
+    def should_process(self, frame_index):
+        if self._last_index is None or frame_index - self._last_index >= self.stride:
+            return True
+        self.skipped += 1
+        return False
+
+    def observe(self, frame_index, frame):
+        """Marca el cuadro como procesado y evalúa si hubo un pico de movimiento."""
+        self._last_index = frame_index
+        self.processed += 1
+        if self._burst_left > 0:
+            self._burst_left -= 1
+
+        if self.motion_threshold is None:
+            return None
+        small = downscale_gray(frame)
+        score = motion_score(self._previous_small, small)
+        self._previous_small = small
+        if score >= self.motion_threshold and self.burst_frames and self.processed > 1:
+            self._burst_left = self.burst_frames
+            self.bursts += 1
+        return score
+
+    def stats(self):
+        total = self.processed + self.skipped
+        return {
+            'processed': self.processed,
+            'skipped': self.skipped,
+            'skipped_fraction': round(self.skipped / total, 4) if total else 0,
+            'stride': self.stride,
+            'latency_ms': round(self.latency * 1000, 2) if self.latency else None,
+            'motion_bursts': self.bursts,
+        }
+
+
+class MotionGate:
+    """
+    Decide si un cuadro necesita inferencia o si basta con reutilizar las
+    detecciones del último cuadro inferido (escenas estáticas: noche,
+    semáforo en rojo).
+
+    Método 'diff': diferencia media entre el cuadro reducido y el del último
+    cuadro inferido, de modo que los cambios lentos se acumulan hasta
+    superar el umbral. Método 'mog2': fracción de píxeles en primer plano
+    según un sustractor de fondo de OpenCV. Tras `max_reuse` cuadros
+    reutilizados seguidos se fuerza una inferencia para refrescar.
+    """
+
+    def __init__(self, threshold=0.01, method='diff', max_reuse=15):
+        self.threshold = threshold
+        self.method = method
+        self.max_reuse = max_reuse
+        self.checked = 0
+        self.skipped = 0
+        self._reference = None
+        self._reused = 0
+        self._subtractor = cv2.createBackgroundSubtractorMOG2(detectShadows=False) if method == 'mog2' else None
+
+    def score(self, small):
+        if self._subtractor is not None:
+            mask = self._subtractor.apply(small)
+            return float(np.count_nonzero(mask)) / mask.size
+        return motion_score(self._reference, small)
+
+    def needs_inference(self, frame):
+        self.checked += 1
+        small = downscale_gray(frame)
+        score = self.score(small)
+        if self._reference is None or score >= self.threshold or self._reused >= self.max_reuse:
+            self._reference = small
+            self._reused = 0
+            return True
+        self._reused += 1
+        self.skipped += 1
+        return False
+
+    def stats(self):
+        return {
+            'checked': self.checked,
+            'skipped': self.skipped,
+            'skipped_fraction': round(self.skipped / self.checked, 4) if self.checked else 0,
+        }
@@ -0,0 +1,110 @@
+import base64
+import threading
+
+import cv2
+
+
+DEFAULT_OPTIONS = {
+    'mode': 'base64',   # 'base64' (JPEG en texto, compatible) o 'binary' (JPEG como adjunto binario)
+    'quality': 80,      # Calidad JPEG 1-100
+    'max_width': None,  # Ancho máximo del cuadro enviado; None para no reducir
+}
+
+
+def normalize_options(data):
+    """Valida las opciones de transporte enviadas por un cliente."""
+    data = data or {}
+    options = dict(DEFAULT_OPTIONS)
+    if data.get('mode') in ('base64', 'binary'):
+        options['mode'] = data['mode']
+    if data.get('quality') is not None:
+        options['quality'] = min(max(int(data['quality']), 1), 100)
+    if data.get('max_width'):
+        options['max_width'] = max(int(data['max_width']), 16)
+    return options
+
+
+def encode_frame(frame, quality=80, max_width=None):
+    """Reduce el cuadro si supera `max_width` y lo codifica como JPEG. Devuelve (bytes, escala)."""
+    scale = 1.0
+    height, width = frame.shape[:2]
+    if max_width and width > max_width:
+        scale = max_width / width
+        frame = cv2.resize(frame, (max_width, int(round(height * scale))), interpolation=cv2.INTER_AREA)
+    _, buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    return buffer.tobytes(), scale
+
+
+def compact_detections(detections):
+    """
+    Representación compacta de las detecciones para el modo binario:
+    una fila [id, etiqueta, confianza, x1, y1, x2, y2] por detección.
+    """
+    return [
+        [det.get('id'), det['label'], round(float(det['confidence']), 4), *[int(v) for v in det['bbox']]]
+        for det in detections
+    ]
+
+
+class FrameBroadcaster:
+    """
+    Envía cuadros anotados a los clientes conectados según las opciones de
+    cada uno. Cada cuadro se codifica una sola vez por combinación de
+    opciones (modo, calidad, ancho) y se envía a todos los clientes que la
+    comparten. Los clientes que no configuraron nada reciben el formato
+    original: JPEG en base64 dentro del JSON.
+    """
+
+    def __init__(self, socketio):
+        self.socketio = socketio
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def connect(self, sid):
+        with self._lock:
+            self._clients.setdefault(sid, dict(DEFAULT_OPTIONS))
+
+    def disconnect(self, sid):
+        with self._lock:
+            self._clients.pop(sid, None)
+
+    def set_options(self, sid, data):
+        options = normalize_options(data)
+        with self._lock:
+            self._clients[sid] = options
+        return options
+
+    def _groups(self):
+        groups = {}
+        with self._lock:
+            for sid, options in self._clients.items():
+                key = (options['mode'], options['quality'], options['max_width'])
+                groups.setdefault(key, []).append(sid)
+        return groups
+
+    def prepare(self, frame):
+        """Codifica el cuadro para cada grupo de clientes. Se puede llamar en otro hilo que `send`."""
+        prepared = []
+        for (mode, quality, max_width), sids in self._groups().items():
+            data, scale = encode_frame(frame, quality, max_width)
+            if mode == 'base64':
+                data = base64.b64encode(data).decode('utf-8')
+            prepared.append((mode, sids, data, scale))
+        return prepared
+
+    def send(self, event, prepared, detections, **meta):
+        """
+        Emite un cuadro ya preparado. En modo base64 las detecciones van
+        completas; en modo binario van en formato compacto.
+        """
+        for mode, sids, data, scale in prepared:
+            if mode == 'binary':
+                payload = dict(meta, frame=data, format='jpeg', scale=scale,
+                               detections=compact_detections(detections))
+            else:
+                payload = dict(meta, frame=data, detections=detections)
+            for sid in sids:
+                self.socketio.emit(event, payload, to=sid)
+
+    def broadcast(self, event, frame, detections, **meta):
+        self.send(event, self.prepare(frame), detections, **meta)
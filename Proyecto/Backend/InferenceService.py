@@ -0,0 +1,336 @@
+import gc
+import os
+import threading
+import queue
+from collections import Counter
+from concurrent.futures import Future
+from time import monotonic, perf_counter
+
+import numpy as np
+
+from ModelBackends import load_model, resolve_backend
+
+
+class BatchScheduler:
+    """
+    Agrupa cuadros enviados por varios productores (streams, trabajos) en
+    lotes para el modelo.
+
+    Un hilo toma el primer cuadro en espera y junta los que lleguen durante
+    `max_latency` segundos, hasta `max_batch_size`; luego llama a
+    `predict(frames)` una sola vez y entrega cada resultado en el Future del
+    cuadro correspondiente.
+    """
+
+    def __init__(self, predict, max_batch_size=16, max_latency=0.01):
+        self.predict_batch = predict
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_latency = max_latency
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._frames = 0
+        self._batches = 0
+        self._errors = 0
+        self._inference_seconds = 0.0
+        self._wait_seconds = 0.0
+        self._last_batch_ms = None
+
+    def reset(self):
+        """
+        Descarta la cola, los cerrojos y el hilo heredados de otro proceso
+        (tras un fork solo sobrevive el hilo que lo hizo).
+        """
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='batch-scheduler', daemon=True)
+                self._thread.start()
+
+    def submit(self, frame):
+        """Encola un cuadro y devuelve un Future con su resultado."""
+        self.start()
+        future = Future()
+        self._queue.put((frame, future, monotonic()))
+        return future
+
+    def submit_many(self, frames):
+        """Encola varios cuadros; pueden repartirse en lotes junto con los de otros productores."""
+        return [self.submit(frame) for frame in frames]
+
+    def predict(self, frame, timeout=None):
+        """Atajo bloqueante: encola el cuadro y espera su resultado."""
+        return self.submit(frame).result(timeout=timeout)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = monotonic() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def metrics(self):
+        """Métricas acumuladas: profundidad de cola, tamaños de lote y tiempos."""
+        with self._stats_lock:
+            return {
+                'queue_depth': self.queue_depth,
+                'frames': self._frames,
+                'batches': self._batches,
+                'errors': self._errors,
+                'mean_batch_size': round(self._frames / self._batches, 2) if self._batches else 0,
+                'batch_size_histogram': dict(sorted(self._batch_sizes.items())),
+                'mean_batch_ms': round(self._inference_seconds / self._batches * 1000, 2) if self._batches else 0,
+                'mean_queue_wait_ms': round(self._wait_seconds / self._frames * 1000, 2) if self._frames else 0,
+                'last_batch_ms': self._last_batch_ms,
+                'max_batch_size': self.max_batch_size,
+                'max_latency_ms': self.max_latency * 1000,
+            }
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            frames = [frame for frame, _, _ in batch]
+            dequeued = monotonic()
+            start = perf_counter()
+            try:
+                results = list(self.predict_batch(frames))
+                # Un resultado por cuadro; si faltan, falla todo el lote para que ningún Future quede sin resolver
+                if len(results) != len(batch):
+                    raise RuntimeError(f'El modelo devolvió {len(results)} resultados para {len(batch)} cuadros')
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                with self._stats_lock:
+                    self._errors += 1
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            elapsed = perf_counter() - start
+
+            with self._stats_lock:
+                self._batches += 1
+                self._frames += len(batch)
+                self._batch_sizes[len(batch)] += 1
+                self._inference_seconds += elapsed
+                self._wait_seconds += sum(dequeued - queued for _, _, queued in batch)
+                self._last_batch_ms = round(elapsed * 1000, 2)
+
+
+class InferenceUnavailable(RuntimeError):
+    """El modelo no está disponible en este proceso (inferencia desactivada o error al cargarlo)."""
+
+
+class InferenceService:
+    """
+    Único dueño del modelo YOLO del proceso.
+
+    Todas las rutas (imágenes, trabajos de video y streams) envían sus
+    cuadros aquí; un BatchScheduler los agrupa en micro-lotes dentro de
+    `max_latency` segundos y devuelve Futures, de modo que el modelo solo se
+    usa desde un hilo y las cargas que se solapan comparten cada llamada.
+
+    `backend` elige el runtime ('auto', 'torch', 'onnx', 'openvino' u
+    'onnx-int8'; ver ModelBackends); `imgsz` es el tamaño de entrada del
+    modelo exportado y `export_options` (cuantización, calibración) se pasan
+    a la exportación.
+
+    El modelo se carga en el primer uso (`model`, `names`, `version` o una
+    inferencia), no al construir el servicio: los procesos que no infieren
+    nunca importan ultralytics ni torch. Con `enabled=False` cualquier uso
+    lanza InferenceUnavailable. Si la carga (o la exportación) falla, durante
+    `retry_after` segundos cualquier uso lanza InferenceUnavailable de
+    inmediato, sin reintentarla.
+    """
+
+    def __init__(self, model_path, max_batch_size=32, max_latency=0.01, backend='torch', imgsz=640,
+                 export_options=None, enabled=True, retry_after=30.0):
+        self.model_path = model_path
+        self.requested_backend = backend
+        self.imgsz = imgsz
+        self.export_options = export_options or {}
+        self.enabled = enabled
+        self.retry_after = retry_after
+        self.backend = None
+        self.loaded_path = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.load_error = None
+        self._model = None
+        self._version = None
+        self._options = {}
+        self._failed_at = None
+        self._load_lock = threading.Lock()
+        self.scheduler = BatchScheduler(self._predict, max_batch_size=max_batch_size, max_latency=max_latency)
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    def load(self):
+        """Carga el modelo si aún no está cargado y lo devuelve. Seguro entre hilos."""
+        if self._model is not None:
+            return self._model
+        if not self.enabled:
+            raise InferenceUnavailable('La inferencia está desactivada en este proceso')
+        self._check_cooldown()
+
+        with self._load_lock:
+            if self._model is None:
+                # Otro hilo pudo fallar mientras este esperaba el cerrojo
+                self._check_cooldown()
+                start = perf_counter()
+                try:
+                    model, backend, loaded_path = load_model(
+                        self.model_path, backend=self.requested_backend, imgsz=self.imgsz, **self.export_options
+                    )
+                    version = self._make_version(self.model_path, os.path.basename(loaded_path))
+                except Exception as e:
+                    self.load_error = f'No se pudo cargar el modelo: {e}'
+                    self._failed_at = monotonic()
+                    print(f"Error al cargar el modelo: {e}")
+                    raise InferenceUnavailable(self.load_error) from e
+
+                self._failed_at = None
+                self.backend, self.loaded_path, self._version = backend, loaded_path, version
+                # Los modelos exportados tienen tamaño de entrada fijo; el .pt conserva el de su entrenamiento
+                self._options = {} if backend == 'torch' else {'imgsz': self.imgsz}
+                self.load_error = None
+                self.load_seconds = perf_counter() - start
+                self._model = model
+                print(f"Modelo cargado exitosamente (backend: {backend}, {self.load_seconds:.2f} s)")
+        return self._model
+
+    def _check_cooldown(self):
+        """Tras un fallo de carga, rechaza de inmediato hasta que pasen `retry_after` segundos."""
+        failed_at = self._failed_at
+        if failed_at is not None and monotonic() - failed_at < self.retry_after:
+            raise InferenceUnavailable(self.load_error)
+
+    @property
+    def model(self):
+        return self.load()
+
+    @property
+    def names(self):
+        """Mapea los índices de las clases a etiquetas."""
+        return self.load().names
+
+    @property
+    def version(self):
+        self.load()
+        return self._version
+
+    @staticmethod
+    def _make_version(model_path, variant=None):
+        """
+        Identificador de la versión del modelo: cambia si se reemplaza el
+        archivo de pesos o el artefacto cargado (ONNX, INT8...), cuyos
+        resultados difieren levemente.
+        """
+        stat = os.stat(model_path)
+        return f'{os.path.basename(model_path)}:{stat.st_size}:{int(stat.st_mtime)}:{variant or "torch"}'
+
+    def warmup(self):
+        """
+        Carga el modelo y pasa un cuadro vacío por el scheduler, para que la
+        primera petición no pague la carga ni la inicialización del runtime.
+        """
+        self.load()
+        start = perf_counter()
+        self.predict(np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8))
+        self.warmup_seconds = perf_counter() - start
+        print(f"Calentamiento del modelo: {self.warmup_seconds:.2f} s")
+
+    def warmup_in_background(self):
+        """Calentamiento en un hilo aparte; los errores solo se registran."""
+        def run():
+            try:
+                self.warmup()
+            except Exception as e:
+                print(f"Error en el calentamiento del modelo: {e}")
+
+        threading.Thread(target=run, name='model-warmup', daemon=True).start()
+
+    def share_before_fork(self):
+        """
+        Para servidores pre-fork que importan la app en el proceso maestro
+        (p. ej. gunicorn --preload). Con el backend de PyTorch carga los
+        pesos sin inferir y congela el recolector de basura, de modo que los
+        workers comparten las páginas del modelo copy-on-write en lugar de
+        copiarlas cuando el GC recorre los objetos. No se infiere en el
+        maestro porque los hilos (scheduler, pools del runtime) no
+        sobreviven al fork; cada worker se calienta en segundo plano justo
+        después de crearse.
+
+        Los backends exportados (ONNX, OpenVINO) abren la sesión del runtime
+        recién en la primera inferencia y esa sesión no es segura entre
+        procesos, así que no hay nada que compartir: el maestro no carga el
+        modelo y cada worker lo carga y calienta por su cuenta. Devuelve True
+        si los pesos quedaron compartidos.
+        """
+        shared = resolve_backend(self.requested_backend) == 'torch'
+        if shared:
+            self.load()
+            gc.collect()
+            gc.freeze()
+        else:
+            print("Precarga: el modelo solo se comparte con PyTorch; cada worker lo cargará y calentará")
+
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+        else:
+            self.warmup_in_background()
+        return shared
+
+    def _after_fork(self):
+        self.scheduler.reset()
+        self.warmup_in_background()
+
+    def _predict(self, frames):
+        return self.model(frames, verbose=False, **self._options)
+
+    def submit(self, frame):
+        """Encola un cuadro (imagen BGR de OpenCV) y devuelve un Future con su resultado."""
+        self.load()
+        return self.scheduler.submit(frame)
+
+    def predict(self, frame, timeout=None):
+        """Inferencia bloqueante de un solo cuadro."""
+        return self.submit(frame).result(timeout=timeout)
+
+    def predict_many(self, frames, timeout=None):
+        """Inferencia bloqueante de varios cuadros; los resultados conservan el orden."""
+        self.load()
+        return [future.result(timeout=timeout) for future in self.scheduler.submit_many(frames)]
+
+    def metrics(self):
+        """Métricas del scheduler y estado del modelo; no fuerza la carga."""
+        return dict(
+            self.scheduler.metrics(),
+            model=self.model_path,
+            enabled=self.enabled,
+            loaded=self.loaded,
+            version=self._version,
+            backend=self.backend,
+            loaded_path=self.loaded_path,
+            load_seconds=round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            warmup_seconds=round(self.warmup_seconds, 3) if self.warmup_seconds is not None else None,
+            load_error=self.load_error
+        )
@@ -0,0 +1,194 @@
+import threading
+import queue
+from collections import OrderedDict
+from datetime import datetime
+from time import monotonic
+from uuid import uuid4
+
+
+class JobQueueFull(Exception):
+    """La cola de trabajos alcanzó su capacidad máxima."""
+
+
+class JobCancelled(Exception):
+    """Se lanza dentro de un trabajo cuando se solicitó su cancelación."""
+
+
+class Job:
+    """Estado de un trabajo de procesamiento en segundo plano."""
+
+    def __init__(self, kind, payload):
+        self.id = uuid4().hex
+        self.kind = kind
+        self.payload = payload
+        self.status = 'queued'  # queued | running | completed | failed | cancelled
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self.frames_total = 0
+        self.frames_processed = 0
+        self.result = None
+        self.error = None
+        self._cancel_event = threading.Event()
+        self._last_report = 0.0
+
+    @property
+    def cancel_requested(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def finished(self):
+        return self.status in ('completed', 'failed', 'cancelled')
+
+    def cancel(self):
+        """Marca el trabajo para que se detenga en el siguiente punto de control."""
+        self._cancel_event.set()
+
+    def check_cancelled(self):
+        """Lanza JobCancelled si se pidió cancelar el trabajo."""
+        if self._cancel_event.is_set():
+            raise JobCancelled(f'Trabajo {self.id} cancelado')
+
+    def to_dict(self):
+        progress = None
+        if self.frames_total:
+            progress = round(min(self.frames_processed / self.frames_total, 1.0) * 100, 2)
+        return {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'filename': self.payload.get('filename'),
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'frames_total': self.frames_total,
+            'frames_processed': self.frames_processed,
+            'progress': progress,
+            'result': self.result,
+            'error': self.error,
+        }
+
+
+class JobManager:
+    """
+    Cola acotada de trabajos atendida por un número fijo de workers.
+
+    `handler(job)` se ejecuta en un hilo worker y su valor de retorno queda en
+    `job.result`. `on_update(job)` se invoca en cada cambio de estado y en los
+    reportes de progreso (limitados a uno cada `progress_interval` segundos).
+    """
+
+    def __init__(self, handler, num_workers=2, max_queue=32, on_update=None,
+                 progress_interval=0.5, max_finished=200):
+        self.handler = handler
+        self.num_workers = max(1, int(num_workers))
+        self.on_update = on_update
+        self.progress_interval = progress_interval
+        self.max_finished = max_finished
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._workers = []
+
+    def start(self):
+        """Inicia los workers (solo la primera vez)."""
+        with self._lock:
+            if self._workers:
+                return
+            for i in range(self.num_workers):
+                worker = threading.Thread(target=self._worker, name=f'job-worker-{i}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def submit(self, kind, payload):
+        """Encola un trabajo nuevo y lo devuelve sin esperar a que se procese."""
+        self.start()
+        job = Job(kind, payload)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            raise JobQueueFull('La cola de procesamiento está llena')
+        self._notify(job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id):
+        """Solicita la cancelación. Devuelve el trabajo o None si no existe."""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if not job.finished:
+            job.cancel()
+            if job.status == 'queued':
+                self._finish(job, 'cancelled')
+        return job
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def report_progress(self, job, frames_processed, frames_total=None):
+        """Actualiza el avance de un trabajo y lo notifica de forma limitada."""
+        job.frames_processed = frames_processed
+        if frames_total is not None:
+            job.frames_total = frames_total
+        now = monotonic()
+        if now - job._last_report >= self.progress_interval:
+            job._last_report = now
+            self._notify(job)
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job.cancel_requested:
+                    if not job.finished:
+                        self._finish(job, 'cancelled')
+                    continue
+
+                job.status = 'running'
+                job.started_at = datetime.now()
+                self._notify(job)
+                try:
+                    job.result = self.handler(job)
+                    self._finish(job, 'completed')
+                except JobCancelled:
+                    self._finish(job, 'cancelled')
+                except Exception as e:
+                    job.error = str(e)
+                    print(f"Error en el trabajo {job.id}: {e}")
+                    self._finish(job, 'failed')
+            finally:
+                self._queue.task_done()
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished_at = datetime.now()
+        self._notify(job)
+        self._prune()
+
+    def _prune(self):
+        """Descarta los trabajos terminados más antiguos para acotar la memoria."""
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+            for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+                del self._jobs[job_id]
+
+    def _notify(self, job):
+        if self.on_update is None:
+            return
+        try:
+            self.on_update(job)
+        except Exception as e:
+            print(f"Error notificando el estado del trabajo {job.id}: {e}")
@@ -0,0 +1,243 @@
+"""
+Backends de ejecución del modelo YOLO.
+
+El modelo entrenado (.pt) se exporta una sola vez a ONNX u OpenVINO y
+ultralytics lo carga con el runtime correspondiente; los resultados
+(`Results`, `names`) tienen la misma forma que con PyTorch, así que el resto
+de la aplicación no cambia.
+
+'onnx-int8' es el modelo ONNX cuantizado a INT8 con ONNX Runtime: estático
+(calibrado con imágenes originales, sin anotar, de calibration/) o dinámico.
+Si no hay imágenes de calibración se cuantiza en dinámico, y si la
+cuantización falla se usa el ONNX FP32.
+
+Exportación manual:
+    python ModelBackends.py [--model modelo_entrenado.pt] [--format onnx openvino onnx-int8] [--imgsz 640]
+                            [--quantization static] [--calibration-dir calibration] [--force]
+"""
+import argparse
+import glob
+import importlib.util
+import os
+
+import cv2
+import numpy as np
+
+
+BACKENDS = ('torch', 'onnx', 'openvino', 'onnx-int8')
+QUANTIZATION_METHODS = ('static', 'dynamic')
+
+# Módulo que debe estar instalado para ejecutar cada backend
+RUNTIME_MODULES = {
+    'torch': 'torch',
+    'onnx': 'onnxruntime',
+    'openvino': 'openvino',
+    'onnx-int8': 'onnxruntime',
+}
+
+
+def runtime_available(backend):
+    return importlib.util.find_spec(RUNTIME_MODULES[backend]) is not None
+
+
+def exported_path(model_path, backend, quantization='static'):
+    """Ruta del artefacto exportado, con los nombres que usa ultralytics."""
+    stem = os.path.splitext(model_path)[0]
+    if backend == 'onnx':
+        return stem + '.onnx'
+    if backend == 'openvino':
+        return stem + '_openvino_model'
+    if backend == 'onnx-int8':
+        return f'{stem}_int8_{quantization}.onnx'
+    return model_path
+
+
+def is_stale(model_path, artifact):
+    """El artefacto falta o es más antiguo que los pesos .pt."""
+    return not os.path.exists(artifact) or os.path.getmtime(artifact) < os.path.getmtime(model_path)
+
+
+def letterbox(image, size):
+    """Redimensiona manteniendo la proporción y rellena a size x size, igual que ultralytics."""
+    height, width = image.shape[:2]
+    ratio = min(size / height, size / width)
+    new_width, new_height = int(round(width * ratio)), int(round(height * ratio))
+    resized = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    top, left = (size - new_height) // 2, (size - new_width) // 2
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    canvas[top:top + new_height, left:left + new_width] = resized
+    return canvas
+
+
+def preprocess(image, size):
+    """Imagen BGR de OpenCV -> tensor NCHW float32 en [0, 1], como la entrada del modelo exportado."""
+    rgb = cv2.cvtColor(letterbox(image, size), cv2.COLOR_BGR2RGB)
+    return np.ascontiguousarray(rgb.transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+
+
+def calibration_images(directory, limit=100):
+    """
+    Rutas de imágenes para calibrar: las de `directory`, sin las de la caché
+    de resultados. Deben ser cuadros originales; las imágenes anotadas de
+    processed/ tienen cajas y etiquetas dibujadas que alteran los rangos.
+    """
+    paths = sorted(
+        path for path in glob.glob(os.path.join(directory, '*'))
+        if path.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp', '.webp'))
+        and not os.path.basename(path).startswith('cache_')
+    )
+    return paths[:limit]
+
+
+def quantize_model(fp32_path, int8_path, method='static', imgsz=640, calibration_dir='calibration',
+                   calibration_limit=100):
+    """
+    Cuantiza a INT8 un modelo ONNX con ONNX Runtime.
+
+    'static' calibra los rangos de las activaciones con imágenes de
+    `calibration_dir` y genera un modelo QDQ (convoluciones INT8, lo más
+    rápido en CPU); 'dynamic' solo cuantiza los pesos y no necesita
+    imágenes. Se conservan los metadatos del modelo original (nombres de
+    clase, tamaño de entrada) para que ultralytics lo cargue igual.
+    """
+    import onnx
+    from onnxruntime.quantization import (
+        CalibrationDataReader, CalibrationMethod, QuantFormat, QuantType, quantize_dynamic, quantize_static
+    )
+
+    if method not in QUANTIZATION_METHODS:
+        raise ValueError(f"Cuantización desconocida: {method}. Use {', '.join(QUANTIZATION_METHODS)}.")
+
+    if method == 'dynamic':
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QUInt8)
+    else:
+        paths = calibration_images(calibration_dir, calibration_limit)
+        if not paths:
+            raise RuntimeError(f'No hay imágenes de calibración en {calibration_dir}')
+        input_name = onnx.load(fp32_path, load_external_data=False).graph.input[0].name
+
+        class ImageReader(CalibrationDataReader):
+            def __init__(self):
+                self._paths = iter(paths)
+
+            def get_next(self):
+                for path in self._paths:
+                    image = cv2.imread(path)
+                    if image is not None:
+                        return {input_name: preprocess(image, imgsz)}
+                return None
+
+        quantize_static(
+            fp32_path, int8_path, ImageReader(),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True,
+            calibrate_method=CalibrationMethod.MinMax
+        )
+
+    # Copiar los metadatos de ultralytics (names, imgsz, task...) al modelo cuantizado
+    source = onnx.load(fp32_path, load_external_data=False)
+    quantized = onnx.load(int8_path)
+    existing = {prop.key for prop in quantized.metadata_props}
+    for prop in source.metadata_props:
+        if prop.key not in existing:
+            quantized.metadata_props.add(key=prop.key, value=prop.value)
+    onnx.save(quantized, int8_path)
+    return int8_path
+
+
+def export_model(model_path, backend, imgsz=640, force=False, quantization='static', calibration_dir='calibration',
+                 calibration_limit=100):
+    """
+    Exporta el modelo al formato del backend si hace falta y devuelve la ruta
+    del artefacto. ONNX se exporta con ejes dinámicos para aceptar los lotes
+    de tamaño variable del BatchScheduler; 'onnx-int8' parte de ese ONNX.
+    La cuantización estática sin imágenes de calibración (p. ej. en un nodo
+    nuevo) pasa a dinámica.
+    """
+    artifact = exported_path(model_path, backend, quantization)
+    if backend == 'torch' or not (force or is_stale(model_path, artifact)):
+        return artifact
+
+    if backend == 'onnx-int8' and quantization == 'static' and not calibration_images(calibration_dir, 1):
+        print(f"No hay imágenes de calibración en {calibration_dir}; se cuantiza en dinámico")
+        quantization = 'dynamic'
+        artifact = exported_path(model_path, backend, quantization)
+        if not (force or is_stale(model_path, artifact)):
+            return artifact
+
+    if backend == 'onnx-int8':
+        fp32_path = export_model(model_path, 'onnx', imgsz=imgsz, force=force)
+        print(f"Cuantizando {fp32_path} a INT8 ({quantization})...")
+        return quantize_model(fp32_path, artifact, method=quantization, imgsz=imgsz,
+                              calibration_dir=calibration_dir, calibration_limit=calibration_limit)
+
+    from ultralytics import YOLO
+
+    options = {'format': backend, 'imgsz': imgsz}
+    if backend == 'onnx':
+        options.update(dynamic=True, simplify=True)
+    print(f"Exportando {model_path} a {backend}...")
+    return str(YOLO(model_path).export(**options))
+
+
+def resolve_backend(name):
+    """
+    Backend efectivo: 'auto' usa ONNX Runtime si está instalado. Si falta el
+    runtime pedido se usa PyTorch.
+    """
+    if name == 'auto':
+        name = 'onnx' if runtime_available('onnx') else 'torch'
+    if name not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {name}. Use auto, {', '.join(BACKENDS)}.")
+    if name != 'torch' and not runtime_available(name):
+        print(f"{RUNTIME_MODULES[name]} no está instalado; se usa PyTorch")
+        return 'torch'
+    return name
+
+
+def load_model(model_path, backend='auto', imgsz=640, **export_options):
+    """
+    Carga el modelo con el backend pedido (exportándolo si hace falta).
+    Devuelve (modelo, backend usado, ruta cargada). Si la cuantización INT8
+    falla se usa el ONNX FP32; si la exportación falla se usa el modelo .pt
+    con PyTorch. `export_options` se pasan a export_model (cuantización y
+    calibración).
+    """
+    from ultralytics import YOLO
+
+    backend = resolve_backend(backend)
+    path = model_path
+    if backend != 'torch':
+        try:
+            path = export_model(model_path, backend, imgsz=imgsz, **export_options)
+        except Exception as e:
+            if backend == 'onnx-int8':
+                print(f"Error al cuantizar el modelo: {e}. Se usa el modelo ONNX FP32.")
+                return load_model(model_path, 'onnx', imgsz)
+            print(f"Error al exportar el modelo a {backend}: {e}. Se usa PyTorch.")
+            backend, path = 'torch', model_path
+    return YOLO(path, task='detect'), backend, path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exporta el modelo YOLO a los backends de CPU')
+    parser.add_argument('--model', default='modelo_entrenado.pt', help='Pesos .pt a exportar')
+    parser.add_argument('--format', nargs='+', choices=BACKENDS[1:], default=['onnx'])
+    parser.add_argument('--imgsz', type=int, default=640, help='Tamaño de entrada del modelo exportado')
+    parser.add_argument('--quantization', choices=QUANTIZATION_METHODS, default='static',
+                        help='Cuantización de onnx-int8')
+    parser.add_argument('--calibration-dir', default='calibration', help='Imágenes originales para calibrar (estática)')
+    parser.add_argument('--calibration-limit', type=int, default=100, help='Máximo de imágenes de calibración')
+    parser.add_argument('--force', action='store_true', help='Exportar aunque el artefacto esté al día')
+    args = parser.parse_args()
+
+    for backend in args.format:
+        path = export_model(args.model, backend, imgsz=args.imgsz, force=args.force, quantization=args.quantization,
+                            calibration_dir=args.calibration_dir, calibration_limit=args.calibration_limit)
+        print(f'{backend}: {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import tuple_
+
+from DatabaseManager import db
+
+
+def encode_cursor(timestamp, row_id):
+    """Cursor opaco con la clave (timestamp, id) de la última fila de una página."""
+    raw = json.dumps([timestamp.isoformat(), row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Devuelve (timestamp, id) de un cursor; lanza ValueError si no es válido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError('Cursor inválido')
+
+
+def keyset_page(query, timestamp_column, id_column, per_page, cursor=None, descending=True):
+    """
+    Una página de `query` ordenada por (timestamp, id), continuando después
+    de `cursor`. La condición es una comparación de filas, así que PostgreSQL
+    recorre el índice (timestamp, id) desde ese punto sin OFFSET.
+
+    Devuelve (filas, siguiente_cursor); siguiente_cursor es None en la última
+    página.
+    """
+    key = tuple_(timestamp_column, id_column)
+    if cursor:
+        position = decode_cursor(cursor)
+        query = query.filter(key < position if descending else key > position)
+    if descending:
+        query = query.order_by(timestamp_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(timestamp_column.asc(), id_column.asc())
+
+    rows = query.limit(per_page + 1).all()
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.timestamp, last.id)
+    return rows, next_cursor
+
+
+def approximate_count(query):
+    """
+    Número de filas estimado por el planificador de PostgreSQL (EXPLAIN), sin
+    ejecutar la consulta. Es instantáneo aunque la tabla tenga millones de
+    filas; la precisión depende de que las estadísticas estén al día.
+    """
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    plan = db.session.connection().exec_driver_sql(
+        'EXPLAIN (FORMAT JSON) ' + str(compiled), compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
@@ -0,0 +1,171 @@
+import csv
+import importlib.util
+import io
+
+from DatabaseManager import db, Detection, Source
+
+
+# Columnas exportadas: (clave, encabezado)
+EXPORT_COLUMNS = [
+    ('id', 'ID'),
+    ('filename', 'Nombre'),
+    ('location', 'Ubicación'),
+    ('vehicle_type', 'Tipo'),
+    ('confidence', 'Confianza'),
+    ('timestamp', 'Fecha/Hora'),
+    ('processing_time', 'Tiempo (s)'),
+]
+
+# Formatos que dependen de un paquete opcional: formato -> módulo
+OPTIONAL_FORMATS = {'parquet': 'pyarrow'}
+
+# Formatos disponibles en esta instalación y su tipo MIME
+EXPORT_FORMATS = {
+    fmt: mimetype
+    for fmt, mimetype in {
+        'txt': 'text/plain',
+        'csv': 'text/csv',
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'parquet': 'application/vnd.apache.parquet',
+    }.items()
+    if fmt not in OPTIONAL_FORMATS or importlib.util.find_spec(OPTIONAL_FORMATS[fmt]) is not None
+}
+
+
+def format_error(fmt):
+    """Mensaje de error si `fmt` no se puede exportar en esta instalación; None si se puede."""
+    if fmt in EXPORT_FORMATS:
+        return None
+    if fmt in OPTIONAL_FORMATS:
+        module = OPTIONAL_FORMATS[fmt]
+        return f'La exportación a {fmt} requiere {module}, que no está instalado (pip install {module}).'
+    return f"Formato no soportado: {fmt}. Use {', '.join(EXPORT_FORMATS)}."
+
+
+def export_query():
+    """Columnas del reporte, sin cargar objetos Detection completos."""
+    return db.session.query(
+        Detection.id, Source.filename, Source.location, Detection.vehicle_type,
+        Detection.confidence, Detection.timestamp, Detection.processing_time
+    ).join(Detection.source).order_by(Detection.timestamp, Detection.id)
+
+
+def iter_rows(query, chunk_size=1000):
+    """
+    Recorre el resultado con un cursor del lado del servidor (`yield_per`):
+    en memoria solo hay `chunk_size` filas a la vez, sin importar cuántas
+    detecciones tenga el rango.
+    """
+    return query.yield_per(chunk_size)
+
+
+def chunked(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def txt_lines(rows):
+    """Líneas del reporte de texto original."""
+    yield "Reporte de Detección de Vehículos\n\n"
+    for row in rows:
+        yield (
+            f"ID: {row.id}, "
+            f"Nombre: {row.filename}, "
+            f"Ubicación: {row.location}, "
+            f"Tipo: {row.vehicle_type}, "
+            f"Confianza: {row.confidence:.2f}%, "
+            f"Fecha/Hora: {row.timestamp.isoformat()}, "
+            f"Tiempo: {row.processing_time}s\n"
+        )
+
+
+def csv_chunks(rows, chunk_size=1000):
+    """Genera el CSV en bloques de texto de `chunk_size` filas, listos para enviarse por HTTP."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for _, header in EXPORT_COLUMNS])
+    for chunk in chunked(rows, chunk_size):
+        writer.writerows(
+            [row.id, row.filename, row.location, row.vehicle_type, row.confidence,
+             row.timestamp.isoformat(), row.processing_time]
+            for row in chunk
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def write_text(chunks, path):
+    with open(path, 'w', encoding='utf-8', newline='') as out:
+        for chunk in chunks:
+            out.write(chunk)
+
+
+def write_xlsx(rows, path):
+    """
+    Escribe el XLSX con xlsxwriter en modo `constant_memory`: cada fila se
+    vuelca a disco al pasar a la siguiente.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    try:
+        sheet = workbook.add_worksheet('Detecciones')
+        date_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+        sheet.write_row(0, 0, [header for _, header in EXPORT_COLUMNS])
+        for index, row in enumerate(rows, start=1):
+            sheet.write_row(index, 0, [row.id, row.filename, row.location, row.vehicle_type,
+                                       row.confidence])
+            sheet.write_datetime(index, 5, row.timestamp, date_format)
+            sheet.write_number(index, 6, row.processing_time or 0)
+    finally:
+        workbook.close()
+
+
+def write_parquet(rows, path, chunk_size=10000):
+    """Escribe Parquet por grupos de `chunk_size` filas. Requiere pyarrow (opcional)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError('La exportación a Parquet requiere pyarrow (pip install pyarrow)')
+
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('filename', pa.string()),
+        ('location', pa.string()),
+        ('vehicle_type', pa.string()),
+        ('confidence', pa.float64()),
+        ('timestamp', pa.timestamp('us')),
+        ('processing_time', pa.float64()),
+    ])
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunked(rows, chunk_size):
+            columns = list(zip(*chunk))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+
+
+def write_report(query, path, fmt, chunk_size=1000):
+    """Escribe el reporte de `query` en `path` con el formato pedido, sin cargar todas las filas."""
+    rows = iter_rows(query, chunk_size)
+    if fmt == 'txt':
+        write_text(txt_lines(rows), path)
+    elif fmt == 'csv':
+        write_text(csv_chunks(rows, chunk_size), path)
+    elif fmt == 'xlsx':
+        write_xlsx(rows, path)
+    elif fmt == 'parquet':
+        write_parquet(rows, path, chunk_size=max(chunk_size, 10000))
+    else:
+        raise ValueError(f'Formato de exportación desconocido: {fmt}')
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import cv2
+
+
+class ResultCache:
+    """
+    Caché de resultados de inferencia indexada por el contenido de la imagen.
+
+    La clave es el SHA-256 de los bytes subidos más la versión del modelo,
+    así que un reenvío de la misma foto (aunque tenga otro nombre) devuelve
+    las detecciones y la imagen anotada sin volver a inferir ni consultar la
+    base de datos. Cada entrada se guarda en `directory` como
+    `cache_<clave>.jpg` (imagen anotada) y `cache_<clave>.json`
+    (detecciones), de modo que sobrevive a reinicios. Se descartan las
+    entradas menos usadas cuando se superan `max_entries` o `max_bytes`.
+    """
+
+    PREFIX = 'cache_'
+
+    def __init__(self, directory, max_entries=512, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # clave -> {'detections', 'image', 'size'}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def make_key(data, model_version):
+        digest = hashlib.sha256()
+        digest.update(model_version.encode('utf-8'))
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, f'{self.PREFIX}{key}')
+        return base + '.jpg', base + '.json'
+
+    def _load(self):
+        """Reconstruye el índice desde disco, del más antiguo al más reciente."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not (name.startswith(self.PREFIX) and name.endswith('.json')):
+                continue
+            key = name[len(self.PREFIX):-len('.json')]
+            image_path, meta_path = self._paths(key)
+            try:
+                with open(meta_path, encoding='utf-8') as meta_file:
+                    detections = json.load(meta_file)
+                size = os.path.getsize(image_path) + os.path.getsize(meta_path)
+                entries.append((os.path.getmtime(meta_path), key, detections, size))
+            except (OSError, ValueError):
+                continue
+        for _, key, detections, size in sorted(entries):
+            self._entries[key] = {'detections': detections, 'image': os.path.basename(self._paths(key)[0]), 'size': size}
+            self._bytes += size
+        self._evict()
+
+    def get(self, key):
+        """Devuelve la entrada (y la marca como usada) o None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, detections, annotated_image):
+        image_path, meta_path = self._paths(key)
+        cv2.imwrite(image_path, annotated_image)
+        with open(meta_path, 'w', encoding='utf-8') as meta_file:
+            json.dump(detections, meta_file)
+        size = os.path.getsize(image_path) + os.path.getsize(meta_path)
+
+        entry = {'detections': detections, 'image': os.path.basename(image_path), 'size': size}
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous['size']
+            self._entries[key] = entry
+            self._bytes += size
+            self._evict()
+        return entry
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key, entry = self._entries.popitem(last=False)
+            self._bytes -= entry['size']
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes}
@@ -0,0 +1,127 @@
+import threading
+from datetime import datetime
+from uuid import uuid4
+
+
+class StreamLimitReached(Exception):
+    """Se alcanzó el número máximo de streams simultáneos."""
+
+
+def parse_source(source):
+    """
+    Normaliza la fuente de video para OpenCV: un índice de dispositivo
+    ("0", 1) se convierte a int; rutas de archivo y URLs (rtsp://, http://)
+    se dejan como texto.
+    """
+    if source is None or source == '':
+        return 0
+    if isinstance(source, int):
+        return source
+    source = str(source).strip()
+    return int(source) if source.isdigit() else source
+
+
+class Stream:
+    """Estado aislado de un stream en vivo: fuente, tracker y contadores propios."""
+
+    def __init__(self, source, stream_id=None, owner=None, tracker=None):
+        self.id = stream_id or uuid4().hex[:8]
+        self.source = parse_source(source)
+        self.owner = owner
+        self.tracker = tracker
+        self.started_at = datetime.now()
+        self.frames = 0
+        self.error = None
+        self.rate = None  # RateController del stream, si lo usa
+        self.gate = None  # MotionGate del stream, si lo usa
+        self.writer = None  # DetectionWriter del stream, si lo usa
+        self._stop_event = threading.Event()
+        self.thread = None
+
+    @property
+    def active(self):
+        return not self._stop_event.is_set()
+
+    def stop(self):
+        self._stop_event.set()
+
+    @property
+    def location(self):
+        """Nombre de la cámara que se guarda en las detecciones."""
+        return f'Camara{self.source}' if isinstance(self.source, int) else str(self.source)
+
+    def to_dict(self):
+        return {
+            'stream_id': self.id,
+            'source': self.source,
+            'location': self.location,
+            'active': self.active,
+            'started_at': self.started_at.isoformat(),
+            'frames': self.frames,
+            'error': self.error,
+            'sampling': self.rate.stats() if self.rate else None,
+            'motion_gate': self.gate.stats() if self.gate else None,
+            'storage': self.writer.status() if self.writer else None,
+        }
+
+
+class StreamManager:
+    """
+    Registro de streams en vivo. Cada stream corre `runner(stream)` en su
+    propio hilo hasta que se detiene o se agota la fuente.
+    """
+
+    def __init__(self, runner, max_streams=16, tracker_factory=None):
+        self.runner = runner
+        self.max_streams = max_streams
+        self.tracker_factory = tracker_factory
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def start(self, source, stream_id=None, owner=None):
+        with self._lock:
+            if stream_id and stream_id in self._streams:
+                raise ValueError(f'El stream "{stream_id}" ya está activo')
+            if len(self._streams) >= self.max_streams:
+                raise StreamLimitReached(f'Máximo de {self.max_streams} streams simultáneos')
+
+            tracker = self.tracker_factory() if self.tracker_factory else None
+            stream = Stream(source, stream_id=stream_id, owner=owner, tracker=tracker)
+            self._streams[stream.id] = stream
+
+        stream.thread = threading.Thread(target=self._run, args=(stream,), name=f'stream-{stream.id}', daemon=True)
+        stream.thread.start()
+        return stream
+
+    def _run(self, stream):
+        try:
+            self.runner(stream)
+        except Exception as e:
+            stream.error = str(e)
+            print(f"Error en el stream {stream.id}: {e}")
+        finally:
+            stream.stop()
+            with self._lock:
+                self._streams.pop(stream.id, None)
+
+    def get(self, stream_id):
+        with self._lock:
+            return self._streams.get(stream_id)
+
+    def list(self, owner=None):
+        with self._lock:
+            return [s for s in self._streams.values() if owner is None or s.owner == owner]
+
+    def stop(self, stream_id):
+        """Detiene un stream. Devuelve el stream o None si no existe."""
+        stream = self.get(stream_id)
+        if stream is not None:
+            stream.stop()
+        return stream
+
+    def stop_owned_by(self, owner):
+        """Detiene todos los streams iniciados por un cliente."""
+        streams = self.list(owner)
+        for stream in streams:
+            stream.stop()
+        return streams
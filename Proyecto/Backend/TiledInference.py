@@ -0,0 +1,157 @@
+"""
+Inferencia por mosaicos (sliced inference) para imágenes de alta resolución.
+
+Una foto de 4K reducida a la entrada del modelo (640 px) deja los vehículos
+lejanos en unos pocos píxeles y el modelo no los ve. Aquí la imagen se corta
+en mosaicos solapados del tamaño de entrada, que se infieren en un solo lote
+(más, opcionalmente, la imagen completa para los objetos grandes); las cajas
+se llevan a coordenadas de la imagen y se fusionan entre mosaicos con una
+supresión de no máximos por clase, descartando además los recortes
+parciales de vehículos partidos por el borde de un mosaico.
+"""
+import cv2
+import numpy as np
+
+from BoxUtils import as_boxes, box_areas, ios_one_to_many, nms
+
+
+TILING_MODES = ('off', 'auto', 'always')
+
+
+def tile_starts(length, tile_size, stride):
+    """Inicios de los mosaicos a lo largo de un eje; el último se alinea con el borde."""
+    if length <= tile_size:
+        return [0]
+    starts = list(range(0, length - tile_size, stride))
+    starts.append(length - tile_size)
+    return starts
+
+
+def make_tiles(height, width, tile_size=640, overlap=0.2):
+    """
+    Ventanas (x1, y1, x2, y2) de `tile_size` píxeles que cubren la imagen,
+    solapadas en la fracción `overlap` para que ningún objeto quede cortado
+    en todos los mosaicos que lo tocan.
+    """
+    if tile_size <= 0:
+        raise ValueError('El tamaño del mosaico debe ser positivo')
+    if not 0 <= overlap < 1:
+        raise ValueError('El solapamiento debe estar en [0, 1)')
+    stride = max(1, int(round(tile_size * (1 - overlap))))
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in tile_starts(height, tile_size, stride)
+        for x in tile_starts(width, tile_size, stride)
+    ]
+
+
+def should_tile(image, mode='auto', min_side=1600):
+    """'always' corta siempre, 'off' nunca y 'auto' solo si el lado mayor llega a `min_side`."""
+    if mode not in TILING_MODES:
+        raise ValueError(f"Modo de mosaicos desconocido: {mode}. Use {', '.join(TILING_MODES)}.")
+    if mode == 'auto':
+        return max(image.shape[:2]) >= min_side
+    return mode == 'always'
+
+
+def touches_tile_edge(boxes, window, height, width, margin=2):
+    """
+    Cajas (en coordenadas de la imagen) que tocan un borde interior del
+    mosaico `window`, es decir, posibles recortes de un objeto que sigue en
+    el mosaico vecino. Los bordes de la propia imagen no cuentan.
+    """
+    x1, y1, x2, y2 = window
+    return (
+        ((boxes[:, 0] <= x1 + margin) & (x1 > 0))
+        | ((boxes[:, 1] <= y1 + margin) & (y1 > 0))
+        | ((boxes[:, 2] >= x2 - margin) & (x2 < width))
+        | ((boxes[:, 3] >= y2 - margin) & (y2 < height))
+    )
+
+
+def merge_detections(boxes, scores, classes, iou_threshold=0.5, truncated=None, merge_threshold=0.5):
+    """
+    Fusiona las detecciones de todos los mosaicos, clase por clase, con una
+    supresión de no máximos por IoU que conserva la mejor caja de cada grupo
+    (sin agrandarla). Después se descartan las cajas `truncated` (cortadas
+    por el borde de un mosaico) que quedan contenidas, con una intersección
+    sobre su propia área (IoS) mayor que `merge_threshold`, en otra caja más
+    grande de la misma clase: son el recorte parcial de un vehículo cuya
+    caja completa viene de otro mosaico o de la imagen completa.
+    """
+    boxes = as_boxes(boxes)
+    scores = np.asarray(scores, dtype=np.float32)
+    classes = np.asarray(classes, dtype=int)
+    truncated = np.zeros(len(boxes), dtype=bool) if truncated is None else np.asarray(truncated, dtype=bool)
+    areas = box_areas(boxes)
+
+    keep = []
+    for cls in np.unique(classes):
+        indices = np.flatnonzero(classes == cls)
+        kept = indices[nms(boxes[indices], scores[indices], iou_threshold)]
+        for i in kept:
+            if truncated[i]:
+                larger = kept[areas[kept] > areas[i]]
+                if (ios_one_to_many(boxes[i], boxes[larger]) > merge_threshold).any():
+                    continue
+            keep.append(i)
+
+    keep = np.asarray(keep, dtype=int)
+    keep = keep[np.argsort(-scores[keep], kind='stable')]
+    return boxes[keep], scores[keep], classes[keep]
+
+
+def predict_tiled(predict_many, image, tile_size=640, overlap=0.2, iou_threshold=0.5, merge_threshold=0.5,
+                  include_full=True):
+    """
+    Inferencia por mosaicos de una imagen BGR. `predict_many` recibe la
+    lista de recortes y devuelve un resultado de ultralytics por recorte
+    (InferenceService.predict_many, o el modelo YOLO directamente), así que
+    todos los mosaicos van al modelo en un solo lote.
+
+    Devuelve (cajas N×4 en coordenadas de la imagen, confianzas, clases,
+    número de mosaicos).
+    """
+    height, width = image.shape[:2]
+    windows = make_tiles(height, width, tile_size, overlap)
+    crops = [np.ascontiguousarray(image[y1:y2, x1:x2]) for x1, y1, x2, y2 in windows]
+    offsets = [(x1, y1) for x1, y1, _, _ in windows]
+    if include_full and len(windows) > 1:
+        crops.append(image)
+        offsets.append((0, 0))
+
+    boxes, scores, classes, truncated = [], [], [], []
+    for index, (result, (dx, dy)) in enumerate(zip(predict_many(crops), offsets)):
+        if len(result.boxes) == 0:
+            continue
+        tile_boxes = result.boxes.xyxy.cpu().numpy() + np.array([dx, dy, dx, dy], dtype=np.float32)
+        boxes.append(tile_boxes)
+        scores.append(result.boxes.conf.cpu().numpy())
+        classes.append(result.boxes.cls.cpu().numpy().astype(int))
+        # La pasada de la imagen completa no tiene bordes interiores
+        if index < len(windows):
+            truncated.append(touches_tile_edge(tile_boxes, windows[index], height, width))
+        else:
+            truncated.append(np.zeros(len(tile_boxes), dtype=bool))
+    if not boxes:
+        return as_boxes([]), np.zeros(0, dtype=np.float32), np.zeros(0, dtype=int), len(windows)
+
+    return (*merge_detections(np.concatenate(boxes), np.concatenate(scores), np.concatenate(classes),
+                              iou_threshold, np.concatenate(truncated), merge_threshold), len(windows))
+
+
+def draw_detections(image, boxes, scores, classes, names):
+    """Imagen anotada con las cajas fusionadas, al estilo de Results.plot()."""
+    annotated = image.copy()
+    thickness = max(2, round(sum(image.shape[:2]) / 1000))
+    for box, score, cls in zip(boxes, scores, classes):
+        x1, y1, x2, y2 = (int(round(v)) for v in box)
+        color = tuple(int(c) for c in np.random.default_rng(int(cls)).integers(64, 256, size=3))
+        cv2.rectangle(annotated, (x1, y1), (x2, y2), color, thickness)
+        label = f'{names[int(cls)]} {float(score):.2f}'
+        (text_w, text_h), baseline = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, thickness / 3, 1)
+        top = max(y1 - text_h - baseline, 0)
+        cv2.rectangle(annotated, (x1, top), (x1 + text_w, top + text_h + baseline), color, -1)
+        cv2.putText(annotated, label, (x1, top + text_h), cv2.FONT_HERSHEY_SIMPLEX, thickness / 3,
+                    (255, 255, 255), 1, cv2.LINE_AA)
+    return annotated
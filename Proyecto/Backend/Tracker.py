@@ -0,0 +1,238 @@
+from abc import ABC, abstractmethod
+from time import time
+
+import numpy as np
+
+from BoxUtils import as_boxes, iou_matrix, match_boxes
+
+
+class BaseTracker(ABC):
+    """
+    Interfaz común de los trackers multiobjeto.
+
+    `update(detections, timestamp, frame)` recibe las detecciones del cuadro
+    (dicts con 'bbox', 'label' y 'confidence') y devuelve los objetos
+    rastreados visibles en ese cuadro como dicts con 'id', 'label',
+    'confidence', 'bbox', 'last_seen' (segundos, numérico) y 'new', que es
+    True solo en el cuadro en que el objeto se confirma por primera vez; así
+    cada vehículo se cuenta una sola vez.
+    """
+
+    @abstractmethod
+    def update(self, detections, timestamp=None, frame=None):
+        """Procesa las detecciones de un cuadro y devuelve los objetos rastreados visibles."""
+
+    @abstractmethod
+    def reset(self):
+        """Olvida todos los objetos rastreados y reinicia los identificadores."""
+
+
+class IoUTracker(BaseTracker):
+    """Tracker simple: empareja por IoU contra la última posición de cada objeto."""
+
+    def __init__(self, iou_threshold=0.5, max_age=5.0, match_method='greedy'):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.match_method = match_method
+        self.reset()
+
+    def reset(self):
+        self.objects = []
+        self.next_id = 1
+
+    def update(self, detections, timestamp=None, frame=None):
+        now = time() if timestamp is None else timestamp
+        self.objects = [obj for obj in self.objects if now - obj['last_seen'] <= self.max_age]
+
+        iou = iou_matrix([det['bbox'] for det in detections], [obj['bbox'] for obj in self.objects])
+        matches = dict(match_boxes(iou, self.iou_threshold, self.match_method))
+
+        tracked = []
+        for i, det in enumerate(detections):
+            if i in matches:
+                obj = self.objects[matches[i]]
+                obj.update(bbox=det['bbox'], label=det['label'], confidence=det['confidence'],
+                           last_seen=now, new=False)
+            else:
+                obj = {'id': self.next_id, 'bbox': det['bbox'], 'label': det['label'],
+                       'confidence': det['confidence'], 'last_seen': now, 'new': True}
+                self.next_id += 1
+                self.objects.append(obj)
+            tracked.append(dict(obj))
+        return tracked
+
+
+class KalmanBoxTrack:
+    """
+    Estado de un objeto con modelo de velocidad constante (estilo SORT).
+
+    Estado: [cx, cy, s, r, vcx, vcy, vs], donde s es el área y r la relación
+    de aspecto de la caja. Las velocidades están en unidades por segundo.
+    """
+
+    _H = np.hstack([np.eye(4), np.zeros((4, 3))])
+    _R = np.diag([1.0, 1.0, 10.0, 10.0])
+    _Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 0.0001])
+
+    def __init__(self, track_id, det, timestamp):
+        self.id = track_id
+        self.x = np.zeros(7)
+        self.x[:4] = self._to_z(det['bbox'])
+        self.P = np.diag([10.0, 10.0, 10.0, 10.0, 1e4, 1e4, 1e4])
+        self.label = det['label']
+        self.confidence = det['confidence']
+        self.last_seen = timestamp
+        self.hits = 1
+        self.confirmed = False
+
+    @staticmethod
+    def _to_z(bbox):
+        x1, y1, x2, y2 = as_boxes(bbox)[0]
+        w, h = max(x2 - x1, 1.0), max(y2 - y1, 1.0)
+        return np.array([x1 + w / 2, y1 + h / 2, w * h, w / h])
+
+    def predict(self, dt):
+        if self.x[2] + self.x[6] * dt <= 0:
+            self.x[6] = 0.0
+        F = np.eye(7)
+        F[0, 4] = F[1, 5] = F[2, 6] = dt
+        self.x = F @ self.x
+        self.P = F @ self.P @ F.T + self._Q
+        return self.bbox()
+
+    def update(self, det, timestamp):
+        y = self._to_z(det['bbox']) - self._H @ self.x
+        S = self._H @ self.P @ self._H.T + self._R
+        K = self.P @ self._H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(7) - K @ self._H) @ self.P
+        self.label = det['label']
+        self.confidence = det['confidence']
+        self.last_seen = timestamp
+        self.hits += 1
+
+    def bbox(self):
+        cx, cy, s, r = self.x[:4]
+        w = np.sqrt(max(s * r, 0.0))
+        h = s / w if w > 0 else 0.0
+        return [cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2]
+
+
+class KalmanTracker(BaseTracker):
+    """
+    Tracker SORT: predice cada objeto con un filtro de Kalman y empareja las
+    predicciones con las detecciones por IoU (húngaro o greedy).
+
+    Un objeto se confirma tras `min_hits` apariciones y se descarta si no se
+    ve durante `max_age` segundos.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_age=5.0, min_hits=1, match_method='hungarian'):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.match_method = match_method
+        self.reset()
+
+    def reset(self):
+        self.tracks = []
+        self.next_id = 1
+        self._last_timestamp = None
+
+    def update(self, detections, timestamp=None, frame=None):
+        now = time() if timestamp is None else timestamp
+        dt = 0.0 if self._last_timestamp is None else max(now - self._last_timestamp, 0.0)
+        self._last_timestamp = now
+
+        predicted = [track.predict(dt) for track in self.tracks]
+        iou = iou_matrix([det['bbox'] for det in detections], predicted)
+        matches = match_boxes(iou, self.iou_threshold, self.match_method)
+
+        updated = []
+        matched_detections = set()
+        for det_index, track_index in matches:
+            track = self.tracks[track_index]
+            track.update(detections[det_index], now)
+            matched_detections.add(det_index)
+            updated.append(track)
+
+        for det_index, det in enumerate(detections):
+            if det_index not in matched_detections:
+                track = KalmanBoxTrack(self.next_id, det, now)
+                self.next_id += 1
+                self.tracks.append(track)
+                updated.append(track)
+
+        self.tracks = [track for track in self.tracks if now - track.last_seen <= self.max_age]
+
+        tracked = []
+        for track in updated:
+            if track.hits < self.min_hits:
+                continue
+            new = not track.confirmed
+            track.confirmed = True
+            tracked.append({
+                'id': track.id,
+                'label': track.label,
+                'confidence': track.confidence,
+                'bbox': [int(round(v)) for v in track.bbox()],
+                'last_seen': track.last_seen,
+                'new': new,
+            })
+        return tracked
+
+
+class DeepSortTracker(BaseTracker):
+    """
+    Adaptador para `deep-sort-realtime`. Usa apariencia además de movimiento,
+    por lo que necesita el cuadro original en `update(..., frame=frame)`.
+    """
+
+    def __init__(self, max_age=30, min_hits=1, **kwargs):
+        from deep_sort_realtime.deepsort_tracker import DeepSort
+
+        self._factory = lambda: DeepSort(max_age=max_age, n_init=min_hits, **kwargs)
+        self.reset()
+
+    def reset(self):
+        self.tracker = self._factory()
+        self.counted = set()
+
+    def update(self, detections, timestamp=None, frame=None):
+        now = time() if timestamp is None else timestamp
+        raw = [
+            ([det['bbox'][0], det['bbox'][1], det['bbox'][2] - det['bbox'][0], det['bbox'][3] - det['bbox'][1]],
+             det['confidence'], det['label'])
+            for det in detections
+        ]
+        tracked = []
+        for track in self.tracker.update_tracks(raw, frame=frame):
+            if not track.is_confirmed() or track.time_since_update > 0:
+                continue
+            new = track.track_id not in self.counted
+            self.counted.add(track.track_id)
+            tracked.append({
+                'id': track.track_id,
+                'label': track.get_det_class(),
+                'confidence': track.get_det_conf(),
+                'bbox': [int(round(v)) for v in track.to_ltrb()],
+                'last_seen': now,
+                'new': new,
+            })
+        return tracked
+
+
+TRACKERS = {
+    'kalman': KalmanTracker,
+    'iou': IoUTracker,
+    'deepsort': DeepSortTracker,
+}
+
+
+def create_tracker(name='kalman', **kwargs):
+    """Construye un tracker por nombre ('kalman', 'iou' o 'deepsort')."""
+    try:
+        tracker_class = TRACKERS[name]
+    except KeyError:
+        raise ValueError(f'Tracker desconocido: {name}')
+    return tracker_class(**kwargs)
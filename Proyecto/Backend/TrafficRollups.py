@@ -0,0 +1,151 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from DatabaseManager import db, Detection, DetectionRollup, Source
+
+
+GRANULARITIES = ('minute', 'hour', 'day')
+
+
+def truncate(timestamp, granularity):
+    """Inicio del intervalo de `timestamp`; equivale a date_trunc de PostgreSQL."""
+    if granularity == 'minute':
+        return timestamp.replace(second=0, microsecond=0)
+    if granularity == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if granularity == 'day':
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f'Granularidad desconocida: {granularity}')
+
+
+def aggregate(rows):
+    """
+    Agrupa filas de detecciones (dicts con source_id, vehicle_type,
+    confidence y timestamp) en incrementos por (granularidad, intervalo,
+    origen, tipo).
+    """
+    totals = defaultdict(lambda: [0, 0.0])
+    for row in rows:
+        if row.get('timestamp') is None:
+            continue
+        for granularity in GRANULARITIES:
+            key = (granularity, truncate(row['timestamp'], granularity), row['source_id'], row.get('vehicle_type') or '')
+            totals[key][0] += 1
+            totals[key][1] += row.get('confidence') or 0.0
+    # Orden fijo de claves para que escritores concurrentes no se bloqueen mutuamente
+    return [
+        {'granularity': granularity, 'bucket': bucket, 'source_id': source_id, 'vehicle_type': vehicle_type,
+         'detection_count': count, 'confidence_sum': confidence_sum}
+        for (granularity, bucket, source_id, vehicle_type), (count, confidence_sum) in sorted(totals.items())
+    ]
+
+
+def update_rollups(rows):
+    """
+    Suma las detecciones recién insertadas a los agregados con un único
+    INSERT ... ON CONFLICT DO UPDATE. Se ejecuta en la sesión del llamador,
+    así que queda en la misma transacción que las detecciones.
+    """
+    values = aggregate(rows)
+    if not values:
+        return 0
+    table = DetectionRollup.__table__
+    stmt = pg_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.granularity, table.c.bucket, table.c.source_id, table.c.vehicle_type],
+        set_={
+            'detection_count': table.c.detection_count + stmt.excluded.detection_count,
+            'confidence_sum': table.c.confidence_sum + stmt.excluded.confidence_sum,
+        }
+    )
+    db.session.execute(stmt, values)
+    return len(values)
+
+
+def rebuild_rollups(start=None, end=None):
+    """
+    Recalcula los agregados desde la tabla de detecciones para los días que
+    tocan [start, end) (todo si no hay límites). Se usa tras borrar
+    detecciones y para cargar datos anteriores a los agregados. No hace
+    commit.
+    """
+    if start is not None:
+        start = truncate(start, 'day')
+    if end is not None:
+        day = truncate(end, 'day')
+        end = day if day == end else day + timedelta(days=1)
+
+    table = DetectionRollup.__table__
+    cleanup = delete(table)
+    if start is not None:
+        cleanup = cleanup.where(table.c.bucket >= start)
+    if end is not None:
+        cleanup = cleanup.where(table.c.bucket < end)
+    db.session.execute(cleanup)
+
+    for granularity in GRANULARITIES:
+        bucket = func.date_trunc(granularity, Detection.timestamp)
+        query = select(
+            literal(granularity), bucket, Detection.source_id, func.coalesce(Detection.vehicle_type, ''),
+            func.count(), func.coalesce(func.sum(Detection.confidence), 0.0)
+        ).where(Detection.timestamp.isnot(None))
+        if start is not None:
+            query = query.where(Detection.timestamp >= start)
+        if end is not None:
+            query = query.where(Detection.timestamp < end)
+        query = query.group_by(bucket, Detection.source_id, func.coalesce(Detection.vehicle_type, ''))
+        db.session.execute(insert(table).from_select(
+            ['granularity', 'bucket', 'source_id', 'vehicle_type', 'detection_count', 'confidence_sum'], query
+        ))
+
+
+def query_stats(granularity='hour', start=None, end=None, group_by=('vehicle_type',), location=None,
+                vehicle_type=None):
+    """
+    Serie de conteos desde los agregados: una fila por intervalo y por cada
+    combinación de `group_by` ('vehicle_type' y/o 'source'), con la
+    confianza media. No lee la tabla de detecciones.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Granularidad desconocida: {granularity}. Use {', '.join(GRANULARITIES)}.")
+    unknown = set(group_by) - {'vehicle_type', 'source'}
+    if unknown:
+        raise ValueError(f"No se puede agrupar por: {', '.join(sorted(unknown))}")
+
+    columns = [DetectionRollup.bucket]
+    if 'source' in group_by:
+        columns += [Source.filename, Source.location]
+    if 'vehicle_type' in group_by:
+        columns.append(DetectionRollup.vehicle_type)
+
+    query = db.session.query(
+        *columns,
+        func.sum(DetectionRollup.detection_count).label('detection_count'),
+        func.sum(DetectionRollup.confidence_sum).label('confidence_sum')
+    ).filter(DetectionRollup.granularity == granularity)
+    if 'source' in group_by or location:
+        query = query.join(Source, Source.id == DetectionRollup.source_id)
+    if location:
+        query = query.filter(Source.location == location)
+    if vehicle_type:
+        query = query.filter(DetectionRollup.vehicle_type == vehicle_type)
+    if start is not None:
+        query = query.filter(DetectionRollup.bucket >= start)
+    if end is not None:
+        query = query.filter(DetectionRollup.bucket < end)
+
+    query = query.group_by(*columns).order_by(*columns)
+    series = []
+    for row in query:
+        item = {'bucket': row.bucket.isoformat(), 'count': int(row.detection_count)}
+        if 'source' in group_by:
+            item['filename'] = row.filename
+            item['location'] = row.location
+        if 'vehicle_type' in group_by:
+            item['vehicle_type'] = row.vehicle_type
+        item['mean_confidence'] = round(row.confidence_sum / row.detection_count, 4) if row.detection_count else None
+        series.append(item)
+    return series
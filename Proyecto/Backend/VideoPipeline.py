@@ -0,0 +1,102 @@
+import threading
+import queue
+from contextlib import nullcontext
+
+
+_END = object()  # Marca de fin de flujo entre etapas
+
+
+class Pipeline:
+    """
+    Ejecuta una secuencia de etapas, cada una en su propio hilo, conectadas
+    por colas acotadas.
+
+    `stages` es una lista de tuplas (nombre, función). Cada función recibe el
+    elemento producido por la etapa anterior y devuelve el elemento para la
+    siguiente (o None para descartarlo). La fuente se consume en un hilo
+    adicional. Si una cola se llena, la etapa que la alimenta se bloquea
+    (backpressure), de modo que la memoria queda acotada a `maxsize`
+    elementos por enlace.
+
+    `context` es una fábrica de context managers que envuelve cada hilo
+    (por ejemplo `app.app_context` para acceder a la base de datos).
+    """
+
+    def __init__(self, stages, maxsize=4, context=None, poll_interval=0.1):
+        self.stages = stages
+        self.maxsize = maxsize
+        self.context = context or nullcontext
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._error = None
+        self._error_lock = threading.Lock()
+
+    def run(self, source):
+        """Procesa `source` completo y relanza el primer error de cualquier etapa."""
+        queues = [queue.Queue(maxsize=self.maxsize) for _ in self.stages]
+        threads = [threading.Thread(target=self._produce, args=(source, queues[0]),
+                                    name='pipeline-source', daemon=True)]
+        for i, (name, func) in enumerate(self.stages):
+            out_queue = queues[i + 1] if i + 1 < len(queues) else None
+            threads.append(threading.Thread(target=self._consume, args=(func, queues[i], out_queue),
+                                            name=f'pipeline-{name}', daemon=True))
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self._error is not None:
+            raise self._error
+
+    def _fail(self, error):
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+        self._stop.set()
+
+    def _put(self, out_queue, item):
+        """Encola respetando la capacidad; abandona si el pipeline se detuvo."""
+        while not self._stop.is_set():
+            try:
+                out_queue.put(item, timeout=self.poll_interval)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, in_queue):
+        while not self._stop.is_set():
+            try:
+                return in_queue.get(timeout=self.poll_interval)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _produce(self, source, out_queue):
+        try:
+            with self.context():
+                for item in source:
+                    if not self._put(out_queue, item):
+                        return
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(out_queue, _END)
+
+    def _consume(self, func, in_queue, out_queue):
+        try:
+            with self.context():
+                while True:
+                    item = self._get(in_queue)
+                    if item is _END:
+                        break
+                    result = func(item)
+                    if out_queue is not None and result is not None:
+                        if not self._put(out_queue, result):
+                            break
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            if out_queue is not None:
+                self._put(out_queue, _END)
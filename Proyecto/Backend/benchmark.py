@@ -0,0 +1,545 @@
+"""
+Benchmarks de rendimiento del backend.
+
+Uso:
+    python benchmark.py batch VIDEO [--frames 256] [--batch-sizes 1 8 16 32]
+    python benchmark.py iou [--sizes 10 100 1000]
+    python benchmark.py motion VIDEO [--threshold 0.01] [--method diff]
+    python benchmark.py parity [IMAGEN ...] [--backend onnx] [--imgsz 640] [--min-recall 0.95]
+    python benchmark.py quant [IMAGEN ...] [--quantization static dynamic] [--batch 8]
+    python benchmark.py tiles [IMAGEN ...] [--tile-size 640] [--overlap 0.2] [--large-imgsz 1280] [--labels DIR]
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import sys
+from time import perf_counter
+
+import cv2
+import numpy as np
+
+
+MODEL_PATH = 'modelo_entrenado.pt'
+
+
+def read_frames(video_path, max_frames, frame_skip=3):
+    """Decodifica hasta `max_frames` cuadros muestreados igual que process_video."""
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    frame_count = 0
+    try:
+        while len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if frame_count % frame_skip == 0:
+                frames.append(frame)
+            frame_count += 1
+    finally:
+        cap.release()
+    return frames
+
+
+def bench_batch(args):
+    """Compara cuadros/segundo de la inferencia cuadro a cuadro contra la inferencia por lotes."""
+    from ultralytics import YOLO
+
+    model = YOLO(args.model)
+    frames = read_frames(args.video, args.frames)
+    if not frames:
+        raise SystemExit(f'No se pudieron leer cuadros de {args.video}')
+
+    # Calentamiento para no medir la inicialización del modelo
+    model(frames[:1], verbose=False)
+
+    print(f'{len(frames)} cuadros de {args.video}')
+    print(f'{"lote":>6} {"segundos":>10} {"cuadros/s":>10} {"detecciones":>12}')
+    baseline = None
+    for batch_size in args.batch_sizes:
+        detections = 0
+        start = perf_counter()
+        for i in range(0, len(frames), batch_size):
+            for result in model(frames[i:i + batch_size], verbose=False):
+                detections += len(result.boxes)
+        elapsed = perf_counter() - start
+        fps = len(frames) / elapsed
+        baseline = baseline or fps
+        print(f'{batch_size:>6} {elapsed:>10.2f} {fps:>10.2f} {detections:>12}  (x{fps / baseline:.2f})')
+
+
+def scalar_iou(box1, box2):
+    """IoU escalar en Python puro (implementación previa a BoxUtils)."""
+    x1, y1, x2, y2 = box1
+    x1_, y1_, x2_, y2_ = box2
+    inter_area = max(0, min(x2, x2_) - max(x1, x1_)) * max(0, min(y2, y2_) - max(y1, y1_))
+    union_area = (x2 - x1) * (y2 - y1) + (x2_ - x1_) * (y2_ - y1_) - inter_area
+    return inter_area / union_area if union_area > 0 else 0
+
+
+def random_boxes(rng, n, width=1920, height=1080):
+    xy = rng.uniform(0, [width - 200, height - 200], size=(n, 2))
+    wh = rng.uniform(20, 200, size=(n, 2))
+    return np.hstack([xy, xy + wh]).astype(np.float32)
+
+
+def bench_iou(args):
+    """Compara la matriz de IoU vectorizada contra los bucles anidados en Python."""
+    from BoxUtils import iou_matrix, greedy_match
+
+    rng = np.random.default_rng(0)
+    print(f'{"cajas":>6} {"bucles (ms)":>12} {"numpy (ms)":>11} {"greedy (ms)":>12} {"aceleración":>12}')
+    for n in args.sizes:
+        new_boxes = random_boxes(rng, n)
+        previous_boxes = random_boxes(rng, n)
+        new_list, previous_list = new_boxes.tolist(), previous_boxes.tolist()
+
+        repeats = max(1, 2000 // n)
+        loop_repeats = max(1, repeats // 10) if n >= 1000 else repeats
+
+        start = perf_counter()
+        for _ in range(loop_repeats):
+            [any(scalar_iou(a, b) > 0.5 for b in previous_list) for a in new_list]
+        loop_ms = (perf_counter() - start) / loop_repeats * 1000
+
+        start = perf_counter()
+        for _ in range(repeats):
+            iou = iou_matrix(new_boxes, previous_boxes)
+            (iou > 0.5).any(axis=1)
+        numpy_ms = (perf_counter() - start) / repeats * 1000
+
+        start = perf_counter()
+        for _ in range(repeats):
+            greedy_match(iou_matrix(new_boxes, previous_boxes), 0.5)
+        greedy_ms = (perf_counter() - start) / repeats * 1000
+
+        print(f'{n:>6} {loop_ms:>12.3f} {numpy_ms:>11.3f} {greedy_ms:>12.3f} {loop_ms / numpy_ms:>11.1f}x')
+
+
+def detection_arrays(result):
+    boxes = result.boxes
+    return boxes.xyxy.cpu().numpy(), boxes.cls.cpu().numpy().astype(int)
+
+
+def match_counts(reference, candidate, iou_threshold=0.5):
+    """Verdaderos positivos de `candidate` respecto a `reference` (misma clase, IoU > umbral, uno a uno)."""
+    from BoxUtils import iou_matrix, greedy_match
+
+    ref_boxes, ref_cls = reference
+    cand_boxes, cand_cls = candidate
+    iou = iou_matrix(cand_boxes, ref_boxes)
+    iou[cand_cls[:, None] != ref_cls[None, :]] = 0
+    return len(greedy_match(iou, iou_threshold))
+
+
+def bench_motion(args):
+    """
+    Fracción de cuadros que el MotionGate evita inferir y su impacto en la
+    exactitud: las detecciones reutilizadas se comparan con la inferencia
+    completa de cada cuadro (precisión y recall relativos).
+    """
+    from ultralytics import YOLO
+    from FrameScheduler import MotionGate
+
+    model = YOLO(args.model)
+    frames = read_frames(args.video, args.frames, frame_skip=args.frame_skip)
+    if not frames:
+        raise SystemExit(f'No se pudieron leer cuadros de {args.video}')
+
+    gate = MotionGate(threshold=args.threshold, method=args.method, max_reuse=args.max_reuse)
+    full_seconds = gated_seconds = 0.0
+    true_positives = reference_total = candidate_total = 0
+    last = None
+    for frame in frames:
+        start = perf_counter()
+        reference = detection_arrays(model(frame, verbose=False)[0])
+        full_seconds += perf_counter() - start
+
+        start = perf_counter()
+        if gate.needs_inference(frame) or last is None:
+            last = detection_arrays(model(frame, verbose=False)[0])
+        gated_seconds += perf_counter() - start
+
+        true_positives += match_counts(reference, last)
+        reference_total += len(reference[0])
+        candidate_total += len(last[0])
+
+    stats = gate.stats()
+    precision = true_positives / candidate_total if candidate_total else 1.0
+    recall = true_positives / reference_total if reference_total else 1.0
+    print(f'{len(frames)} cuadros de {args.video} (umbral {args.threshold}, método {args.method})')
+    print(f'cuadros sin inferencia:  {stats["skipped"]} ({stats["skipped_fraction"] * 100:.1f}%)')
+    print(f'tiempo completo:         {full_seconds:.2f} s ({len(frames) / full_seconds:.2f} cuadros/s)')
+    print(f'tiempo con compuerta:    {gated_seconds:.2f} s ({len(frames) / gated_seconds:.2f} cuadros/s)')
+    print(f'precisión relativa:      {precision:.3f}')
+    print(f'recall relativo:         {recall:.3f}')
+
+
+def read_images(paths, limit=None):
+    """Imágenes de prueba; por defecto las de processed/ (sin las de la caché)."""
+    if not paths:
+        paths = sorted(
+            path for path in glob.glob(os.path.join('processed', '*'))
+            if path.lower().endswith(('.jpg', '.jpeg', '.png')) and not os.path.basename(path).startswith('cache_')
+        )
+    images = []
+    for path in paths[:limit]:
+        image = cv2.imread(path)
+        if image is not None:
+            images.append((path, image))
+    return images
+
+
+def timed_predict(model, images, **options):
+    """Inferencia imagen por imagen; devuelve (detecciones, segundos por imagen)."""
+    model(images[0], verbose=False, **options)  # Calentamiento
+    outputs = []
+    start = perf_counter()
+    for image in images:
+        result = model(image, verbose=False, **options)[0]
+        outputs.append((*detection_arrays(result), result.boxes.conf.cpu().numpy()))
+    return outputs, (perf_counter() - start) / len(images)
+
+
+def compare_outputs(reference, candidate, iou_threshold=0.5):
+    """
+    Precisión y recall de `candidate` tomando `reference` como verdad, y
+    diferencia media de confianza en los pares emparejados.
+    """
+    from BoxUtils import iou_matrix, greedy_match
+
+    true_positives = reference_total = candidate_total = 0
+    confidence_diffs = []
+    for (ref_boxes, ref_cls, ref_conf), (cand_boxes, cand_cls, cand_conf) in zip(reference, candidate):
+        iou = iou_matrix(cand_boxes, ref_boxes)
+        iou[cand_cls[:, None] != ref_cls[None, :]] = 0
+        matches = greedy_match(iou, iou_threshold)
+        true_positives += len(matches)
+        reference_total += len(ref_boxes)
+        candidate_total += len(cand_boxes)
+        confidence_diffs += [abs(float(cand_conf[c]) - float(ref_conf[r])) for c, r in matches]
+    return {
+        'precision': true_positives / candidate_total if candidate_total else 1.0,
+        'recall': true_positives / reference_total if reference_total else 1.0,
+        'confidence_diff': float(np.mean(confidence_diffs)) if confidence_diffs else 0.0,
+        'reference': reference_total,
+        'candidate': candidate_total,
+    }
+
+
+def bench_parity(args):
+    """
+    Verifica que un backend exportado (ONNX/OpenVINO) dé las mismas
+    detecciones y nombres de clase que PyTorch, y compara la latencia.
+    Termina con código 1 si no hay paridad.
+    """
+    from ultralytics import YOLO
+    from ModelBackends import export_model, runtime_available
+
+    if not runtime_available(args.backend):
+        raise SystemExit(f'El runtime de {args.backend} no está instalado')
+    images = [image for _, image in read_images(args.images, args.limit)]
+    if not images:
+        raise SystemExit('No hay imágenes de prueba')
+
+    reference_model = YOLO(args.model)
+    candidate_model = YOLO(export_model(args.model, args.backend, imgsz=args.imgsz), task='detect')
+
+    names_match = dict(reference_model.names) == dict(candidate_model.names)
+    reference, torch_seconds = timed_predict(reference_model, images)
+    candidate, backend_seconds = timed_predict(candidate_model, images, imgsz=args.imgsz)
+    stats = compare_outputs(reference, candidate)
+
+    print(f'{len(images)} imágenes, backend {args.backend} contra torch')
+    print(f'nombres de clase iguales: {"sí" if names_match else "NO"}')
+    print(f'detecciones:              torch {stats["reference"]}, {args.backend} {stats["candidate"]}')
+    print(f'precisión relativa:       {stats["precision"]:.3f}')
+    print(f'recall relativo:          {stats["recall"]:.3f}')
+    print(f'diferencia de confianza:  {stats["confidence_diff"]:.4f}')
+    print(f'latencia torch:           {torch_seconds * 1000:.1f} ms/imagen')
+    print(f'latencia backend:         {backend_seconds * 1000:.1f} ms/imagen (x{torch_seconds / backend_seconds:.2f})')
+
+    if not names_match or stats['recall'] < args.min_recall or stats['precision'] < args.min_recall:
+        print('SIN PARIDAD')
+        sys.exit(1)
+    print('paridad OK')
+
+
+def average_precision(predictions, ground_truth, iou_threshold=0.5):
+    """
+    mAP (media por clase del área bajo la curva precisión-recall, con
+    interpolación en todos los puntos) de `predictions` respecto a
+    `ground_truth`. Ambos son listas por imagen de (cajas, clases, confianzas).
+    """
+    from BoxUtils import iou_matrix
+
+    classes = sorted({int(c) for _, gt_cls, _ in ground_truth for c in gt_cls})
+    average_precisions = []
+    for cls in classes:
+        scores, hits, total = [], [], 0
+        for (pred_boxes, pred_cls, pred_conf), (gt_boxes, gt_cls, _) in zip(predictions, ground_truth):
+            gt = gt_boxes[gt_cls == cls]
+            total += len(gt)
+            mask = pred_cls == cls
+            order = np.argsort(-pred_conf[mask])
+            boxes, confs = pred_boxes[mask][order], pred_conf[mask][order]
+            iou = iou_matrix(boxes, gt) if len(boxes) and len(gt) else np.zeros((len(boxes), len(gt)))
+            used = np.zeros(len(gt), dtype=bool)
+            for i, conf in enumerate(confs):
+                candidates = np.flatnonzero(~used & (iou[i] >= iou_threshold))
+                if len(candidates):
+                    used[candidates[np.argmax(iou[i][candidates])]] = True
+                scores.append(conf)
+                hits.append(len(candidates) > 0)
+        if total == 0:
+            continue
+
+        hits = np.array(hits, dtype=bool)[np.argsort(-np.array(scores), kind='stable')]
+        true_positives = np.cumsum(hits)
+        recall = true_positives / total
+        precision = true_positives / np.arange(1, len(hits) + 1)
+        recall = np.concatenate([[0.0], recall, [1.0]])
+        precision = np.concatenate([[1.0], precision, [0.0]])
+        precision = np.flip(np.maximum.accumulate(np.flip(precision)))
+        steps = np.flatnonzero(recall[1:] != recall[:-1])
+        average_precisions.append(float(np.sum((recall[steps + 1] - recall[steps]) * precision[steps + 1])))
+    return float(np.mean(average_precisions)) if average_precisions else 1.0
+
+
+def peak_rss_mb():
+    """
+    Memoria residente máxima del proceso en MB (None si la plataforma no la
+    expone). En Unix es ru_maxrss (KB en Linux, bytes en macOS); en Windows,
+    el pico del working set vía psutil.
+    """
+    try:
+        import resource
+    except ImportError:
+        pass
+    else:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return getattr(psutil.Process().memory_info(), 'peak_wset', 0) / 2 ** 20 or None
+
+
+def run_variant(model_path, imgsz, image_paths, batch_size, results):
+    """
+    Evalúa un modelo en un proceso aparte, para que la memoria medida sea
+    solo la de ese modelo: detecciones por imagen, latencia con lote 1 y
+    rendimiento con lotes de `batch_size`.
+    """
+    from ultralytics import YOLO
+
+    images = [image for _, image in read_images(image_paths)]
+    model = YOLO(model_path, task='detect')
+    options = {} if model_path.endswith('.pt') else {'imgsz': imgsz}
+    outputs, seconds = timed_predict(model, images, **options)
+
+    start = perf_counter()
+    for i in range(0, len(images), batch_size):
+        model(images[i:i + batch_size], verbose=False, **options)
+    throughput = len(images) / (perf_counter() - start)
+    results.put({'outputs': outputs, 'latency': seconds, 'throughput': throughput, 'rss_mb': peak_rss_mb()})
+
+
+def bench_quant(args):
+    """
+    Compara el modelo INT8 (estático y/o dinámico) contra el FP32 en ONNX
+    Runtime. El FP32 hace de verdad de referencia (pseudo ground truth): se
+    informa el mAP50 y mAP50-95 de cada variante respecto a él, la latencia,
+    el rendimiento por lotes y la memoria máxima del proceso.
+    """
+    from ModelBackends import export_model, runtime_available
+
+    if not runtime_available('onnx'):
+        raise SystemExit('onnxruntime no está instalado')
+    image_paths = [path for path, _ in read_images(args.images, args.limit)]
+    if not image_paths:
+        raise SystemExit('No hay imágenes de prueba')
+
+    variants = [('fp32', export_model(args.model, 'onnx', imgsz=args.imgsz))]
+    for method in args.quantization:
+        variants.append((f'int8-{method}', export_model(
+            args.model, 'onnx-int8', imgsz=args.imgsz, quantization=method,
+            calibration_dir=args.calibration_dir, force=args.force
+        )))
+
+    context = multiprocessing.get_context('spawn')
+    measurements = {}
+    for name, path in variants:
+        results = context.Queue()
+        process = context.Process(target=run_variant, args=(path, args.imgsz, image_paths, args.batch, results))
+        process.start()
+        measurements[name] = results.get()
+        process.join()
+
+    reference = measurements['fp32']
+    thresholds = np.arange(0.5, 0.96, 0.05)
+    print(f'{len(image_paths)} imágenes, imgsz {args.imgsz}, lote {args.batch}; referencia: fp32')
+    print(f'{"variante":>14} {"tamaño MB":>10} {"mAP50":>7} {"mAP50-95":>9} {"ms/img":>8} {"img/s":>7} '
+          f'{"aceleración":>12} {"RSS MB":>8}')
+    for name, path in variants:
+        result = measurements[name]
+        map50 = average_precision(result['outputs'], reference['outputs'], 0.5)
+        map50_95 = float(np.mean([average_precision(result['outputs'], reference['outputs'], t) for t in thresholds]))
+        size_mb = os.path.getsize(path) / 2 ** 20
+        rss = f'{result["rss_mb"]:.0f}' if result['rss_mb'] is not None else 'n/d'
+        print(f'{name:>14} {size_mb:>10.1f} {map50:>7.3f} {map50_95:>9.3f} {result["latency"] * 1000:>8.1f} '
+              f'{result["throughput"]:>7.2f} {result["throughput"] / reference["throughput"]:>11.2f}x {rss:>8}')
+
+
+def read_labels(labels_dir, image_path, width, height):
+    """Etiquetas YOLO (clase cx cy w h normalizados) de una imagen como (cajas xyxy, clases)."""
+    path = os.path.join(labels_dir, os.path.splitext(os.path.basename(image_path))[0] + '.txt')
+    rows = np.loadtxt(path, ndmin=2) if os.path.exists(path) and os.path.getsize(path) else np.zeros((0, 5))
+    cx, cy, w, h = rows[:, 1] * width, rows[:, 2] * height, rows[:, 3] * width, rows[:, 4] * height
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1).astype(np.float32)
+    return boxes, rows[:, 0].astype(int)
+
+
+def bench_tiles(args):
+    """
+    Inferencia por mosaicos contra la imagen completa a la entrada normal
+    (--imgsz) y a una entrada grande (--large-imgsz): detecciones, recall y
+    latencia por imagen. Con --labels (etiquetas YOLO) el recall es contra
+    la verdad; sin etiquetas, contra la unión fusionada de las detecciones
+    de los tres modos (pseudo ground truth), que mide qué encuentra cada
+    modo que los otros pierden.
+    """
+    from ultralytics import YOLO
+    from TiledInference import make_tiles, merge_detections, predict_tiled
+
+    images = read_images(args.images, args.limit)
+    if not images:
+        raise SystemExit('No hay imágenes de prueba')
+    model = YOLO(args.model)
+
+    def run_tiled(image):
+        boxes, conf, cls, _ = predict_tiled(
+            lambda crops: model(crops, verbose=False, imgsz=args.tile_size), image,
+            tile_size=args.tile_size, overlap=args.overlap, iou_threshold=args.nms_iou,
+            merge_threshold=args.merge_threshold,
+            include_full=not args.no_full_image
+        )
+        return boxes, cls, conf
+
+    modes = [
+        (f'completa {args.imgsz}', lambda image: model(image, verbose=False, imgsz=args.imgsz)[0]),
+        (f'completa {args.large_imgsz}', lambda image: model(image, verbose=False, imgsz=args.large_imgsz)[0]),
+        (f'mosaicos {args.tile_size}', run_tiled),
+    ]
+    outputs, latencies = {}, {}
+    for name, predict in modes:
+        predict(images[0][1])  # Calentamiento
+        outputs[name] = []
+        start = perf_counter()
+        for _, image in images:
+            output = predict(image)
+            if not isinstance(output, tuple):
+                output = (*detection_arrays(output), output.boxes.conf.cpu().numpy())
+            outputs[name].append(output)
+        latencies[name] = (perf_counter() - start) / len(images)
+
+    if args.labels:
+        reference = [read_labels(args.labels, path, image.shape[1], image.shape[0]) for path, image in images]
+        source = f'etiquetas de {args.labels}'
+    else:
+        reference = []
+        for i in range(len(images)):
+            boxes = np.concatenate([outputs[name][i][0] for name, _ in modes])
+            cls = np.concatenate([outputs[name][i][1] for name, _ in modes])
+            conf = np.concatenate([outputs[name][i][2] for name, _ in modes])
+            merged_boxes, _, merged_cls = merge_detections(boxes, conf, cls, args.nms_iou)
+            reference.append((merged_boxes, merged_cls))
+        source = 'unión de los tres modos'
+
+    tiles = np.mean([len(make_tiles(*image.shape[:2], args.tile_size, args.overlap)) for _, image in images])
+    print(f'{len(images)} imágenes, {tiles:.1f} mosaicos por imagen; referencia: {source}')
+    print(f'{"modo":>16} {"detecciones":>12} {"recall":>7} {"precisión":>10} {"ms/img":>8} {"latencia":>9}')
+    baseline_name, large_name, _ = (name for name, _ in modes)
+    recalls = {}
+    for name, _ in modes:
+        true_positives = sum(
+            match_counts(ref, (boxes, cls), args.iou)
+            for ref, (boxes, cls, _) in zip(reference, outputs[name])
+        )
+        total = sum(len(ref[0]) for ref in reference)
+        found = sum(len(boxes) for boxes, _, _ in outputs[name])
+        recalls[name] = true_positives / total if total else 1.0
+        precision = f'{true_positives / found:.3f}' if args.labels and found else 'n/d'
+        print(f'{name:>16} {found:>12} {recalls[name]:>7.3f} {precision:>10} {latencies[name] * 1000:>8.1f} '
+              f'{latencies[name] / latencies[large_name]:>8.2f}x')
+
+    tiled_name = modes[2][0]
+    print(f'ganancia de recall de mosaicos: {recalls[tiled_name] - recalls[baseline_name]:+.3f} contra {baseline_name}, '
+          f'{recalls[tiled_name] - recalls[large_name]:+.3f} contra {large_name}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks del backend de detección')
+    parser.add_argument('--model', default=MODEL_PATH, help='Ruta del modelo YOLO')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    batch = subparsers.add_parser('batch', help='Inferencia por lotes en video')
+    batch.add_argument('video', help='Video de prueba')
+    batch.add_argument('--frames', type=int, default=256, help='Cuadros muestreados a procesar')
+    batch.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 16, 32])
+    batch.set_defaults(func=bench_batch)
+
+    iou = subparsers.add_parser('iou', help='IoU vectorizado contra bucles en Python')
+    iou.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    iou.set_defaults(func=bench_iou)
+
+    motion = subparsers.add_parser('motion', help='Inferencia condicionada por movimiento')
+    motion.add_argument('video', help='Video de prueba')
+    motion.add_argument('--frames', type=int, default=300, help='Cuadros muestreados a procesar')
+    motion.add_argument('--frame-skip', type=int, default=3)
+    motion.add_argument('--threshold', type=float, default=0.01)
+    motion.add_argument('--method', choices=['diff', 'mog2'], default='diff')
+    motion.add_argument('--max-reuse', type=int, default=15)
+    motion.set_defaults(func=bench_motion)
+
+    parity = subparsers.add_parser('parity', help='Paridad de un backend exportado contra PyTorch')
+    parity.add_argument('images', nargs='*', help='Imágenes de prueba (por defecto, processed/)')
+    parity.add_argument('--backend', choices=['onnx', 'openvino'], default='onnx')
+    parity.add_argument('--imgsz', type=int, default=640)
+    parity.add_argument('--limit', type=int, default=50, help='Máximo de imágenes a comparar')
+    parity.add_argument('--min-recall', type=float, default=0.95,
+                        help='Precisión y recall relativos mínimos para aceptar la paridad')
+    parity.set_defaults(func=bench_parity)
+
+    quant = subparsers.add_parser('quant', help='Modelo INT8 contra FP32: deriva de mAP, latencia y memoria')
+    quant.add_argument('images', nargs='*', help='Imágenes de prueba (por defecto, processed/)')
+    quant.add_argument('--quantization', nargs='+', choices=['static', 'dynamic'], default=['static', 'dynamic'])
+    quant.add_argument('--imgsz', type=int, default=640)
+    quant.add_argument('--batch', type=int, default=8, help='Tamaño de lote para medir el rendimiento')
+    quant.add_argument('--limit', type=int, default=50, help='Máximo de imágenes a evaluar')
+    quant.add_argument('--calibration-dir', default='calibration', help='Imágenes originales para calibrar (estática)')
+    quant.add_argument('--force', action='store_true', help='Volver a cuantizar aunque el modelo esté al día')
+    quant.set_defaults(func=bench_quant)
+
+    tiles = subparsers.add_parser('tiles', help='Inferencia por mosaicos contra una entrada grande: recall y latencia')
+    tiles.add_argument('images', nargs='*', help='Imágenes de prueba (por defecto, processed/)')
+    tiles.add_argument('--tile-size', type=int, default=640)
+    tiles.add_argument('--overlap', type=float, default=0.2)
+    tiles.add_argument('--nms-iou', type=float, default=0.5, help='IoU de la supresión de no máximos entre mosaicos')
+    tiles.add_argument('--merge-threshold', type=float, default=0.5,
+                       help='IoS para descartar cajas cortadas por el borde de un mosaico')
+    tiles.add_argument('--no-full-image', action='store_true', help='No inferir la imagen completa junto a los mosaicos')
+    tiles.add_argument('--imgsz', type=int, default=640, help='Entrada normal de la imagen completa')
+    tiles.add_argument('--large-imgsz', type=int, default=1280, help='Entrada grande de la imagen completa')
+    tiles.add_argument('--labels', help='Directorio con etiquetas YOLO (.txt) de las imágenes')
+    tiles.add_argument('--iou', type=float, default=0.5, help='IoU mínimo para contar un acierto')
+    tiles.add_argument('--limit', type=int, default=50, help='Máximo de imágenes a evaluar')
+    tiles.set_defaults(func=bench_tiles)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
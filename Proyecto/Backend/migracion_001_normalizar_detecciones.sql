@@ -0,0 +1,57 @@
+-- Migración de la tabla detections al esquema normalizado de tablas.sql:
+--   * filename/location pasan a la tabla de búsqueda "sources" (detections.source_id)
+--   * bbox (texto '[x1, y1, x2, y2]') pasa a las columnas numéricas x1, y1, x2, y2;
+--     los bbox que no son cuatro números quedan con coordenadas NULL
+--   * índices B-tree para los filtros por fecha y por origen/tipo
+-- Ejecutar una sola vez: psql -d Proyectodeteccion -f migracion_001_normalizar_detecciones.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS sources (
+    id SERIAL PRIMARY KEY,
+    filename VARCHAR(256) NOT NULL DEFAULT '',
+    location VARCHAR(512) NOT NULL DEFAULT '',
+    CONSTRAINT uq_sources_filename_location UNIQUE (filename, location)
+);
+
+INSERT INTO sources (filename, location)
+SELECT DISTINCT COALESCE(filename, ''), COALESCE(location, '')
+FROM detections
+ON CONFLICT (filename, location) DO NOTHING;
+
+ALTER TABLE detections
+    ADD COLUMN source_id INTEGER REFERENCES sources (id),
+    ADD COLUMN x1 FLOAT,
+    ADD COLUMN y1 FLOAT,
+    ADD COLUMN x2 FLOAT,
+    ADD COLUMN y2 FLOAT;
+
+UPDATE detections d
+SET source_id = s.id
+FROM sources s
+WHERE s.filename = COALESCE(d.filename, '')
+  AND s.location = COALESCE(d.location, '');
+
+UPDATE detections
+SET x1 = coords[1], y1 = coords[2], x2 = coords[3], y2 = coords[4]
+FROM (
+    SELECT id, string_to_array(btrim(bbox, '[] '), ',')::float8[] AS coords
+    FROM detections
+    -- Solo textos con cuatro números: cualquier otro valor abortaría la conversión a float8[]
+    WHERE bbox ~ '^\s*\[?\s*([-+]?([0-9]+(\.[0-9]*)?|\.[0-9]+)([eE][-+]?[0-9]+)?\s*,\s*){3}[-+]?([0-9]+(\.[0-9]*)?|\.[0-9]+)([eE][-+]?[0-9]+)?\s*\]?\s*$'
+) parsed
+WHERE detections.id = parsed.id;
+
+ALTER TABLE detections
+    ALTER COLUMN source_id SET NOT NULL,
+    DROP COLUMN filename,
+    DROP COLUMN location,
+    DROP COLUMN bbox;
+
+CREATE INDEX IF NOT EXISTS ix_detections_timestamp_id ON detections (timestamp, id);
+CREATE INDEX IF NOT EXISTS ix_detections_source_type_timestamp ON detections (source_id, vehicle_type, timestamp);
+
+COMMIT;
+
+ANALYZE sources;
+ANALYZE detections;
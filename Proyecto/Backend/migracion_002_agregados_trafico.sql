@@ -0,0 +1,31 @@
+-- Agregados de tráfico por minuto, hora y día (origen x tipo de vehículo).
+-- La aplicación los actualiza al guardar detecciones; esta migración crea
+-- la tabla y la llena con las detecciones ya existentes.
+-- Requiere migracion_001_normalizar_detecciones.sql.
+-- Ejecutar una sola vez: psql -d Proyectodeteccion -f migracion_002_agregados_trafico.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS detection_rollups (
+    granularity VARCHAR(8) NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    source_id INTEGER NOT NULL REFERENCES sources (id),
+    vehicle_type VARCHAR(64) NOT NULL,
+    detection_count INTEGER NOT NULL DEFAULT 0,
+    confidence_sum FLOAT NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularity, bucket, source_id, vehicle_type)
+);
+
+DELETE FROM detection_rollups;
+
+INSERT INTO detection_rollups (granularity, bucket, source_id, vehicle_type, detection_count, confidence_sum)
+SELECT g.granularity, date_trunc(g.granularity, d.timestamp), d.source_id, COALESCE(d.vehicle_type, ''),
+       count(*), COALESCE(sum(d.confidence), 0)
+FROM detections d
+CROSS JOIN (VALUES ('minute'), ('hour'), ('day')) AS g (granularity)
+WHERE d.timestamp IS NOT NULL
+GROUP BY g.granularity, date_trunc(g.granularity, d.timestamp), d.source_id, COALESCE(d.vehicle_type, '');
+
+COMMIT;
+
+ANALYZE detection_rollups;
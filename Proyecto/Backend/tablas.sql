@@ -1,12 +1,33 @@
+CREATE TABLE sources (
+    id SERIAL PRIMARY KEY,
+    filename VARCHAR(256) NOT NULL DEFAULT '',
+    location VARCHAR(512) NOT NULL DEFAULT '',
+    CONSTRAINT uq_sources_filename_location UNIQUE (filename, location)
+);
+
 CREATE TABLE detections (
     id SERIAL PRIMARY KEY,
-    filename VARCHAR(256),
-    location VARCHAR(512),
+    source_id INTEGER NOT NULL REFERENCES sources (id),
     vehicle_type VARCHAR(64),
     confidence FLOAT,
     timestamp TIMESTAMP,
     processing_time FLOAT,
     processed BOOLEAN,
-    bbox TEXT
+    x1 FLOAT,
+    y1 FLOAT,
+    x2 FLOAT,
+    y2 FLOAT
 );
 
+CREATE INDEX ix_detections_timestamp_id ON detections (timestamp, id);
+CREATE INDEX ix_detections_source_type_timestamp ON detections (source_id, vehicle_type, timestamp);
+
+CREATE TABLE detection_rollups (
+    granularity VARCHAR(8) NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    source_id INTEGER NOT NULL REFERENCES sources (id),
+    vehicle_type VARCHAR(64) NOT NULL,
+    detection_count INTEGER NOT NULL DEFAULT 0,
+    confidence_sum FLOAT NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularity, bucket, source_id, vehicle_type)
+);
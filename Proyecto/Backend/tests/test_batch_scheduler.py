@@ -0,0 +1,28 @@
+import threading
+
+import pytest
+
+from InferenceService import BatchScheduler
+
+
+def test_results_match_frames():
+    scheduler = BatchScheduler(lambda frames: [frame * 2 for frame in frames], max_batch_size=8, max_latency=0.01)
+    futures = scheduler.submit_many([1, 2, 3])
+    assert [future.result(timeout=5) for future in futures] == [2, 4, 6]
+
+
+def test_short_results_fail_every_future():
+    release = threading.Event()
+
+    def short_predict(frames):
+        release.wait(5)
+        return frames[:-1]
+
+    scheduler = BatchScheduler(short_predict, max_batch_size=8, max_latency=0.5)
+    futures = scheduler.submit_many([1, 2, 3])
+    release.set()
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match='resultados'):
+            future.result(timeout=5)
+    assert scheduler.metrics()['errors'] >= 1
@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import pytest
+
+import DatabaseManager
+import DetectionWriter as writer_module
+from DetectionWriter import DetectionWriter
+
+
+class FakeSession:
+    def __init__(self):
+        self.fail = True
+        self.inserts = []
+        self.rollbacks = 0
+
+    def execute(self, statement, rows):
+        self.inserts.append(list(rows))
+
+    def commit(self):
+        if self.fail:
+            raise RuntimeError('base de datos caída')
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = FakeSession()
+    clock = FakeClock()
+    monkeypatch.setattr(writer_module, 'db', type('FakeDB', (), {'session': session})())
+    monkeypatch.setattr(writer_module, 'update_rollups', lambda rows: None)
+    monkeypatch.setattr(writer_module, 'monotonic', clock)
+    monkeypatch.setattr(DatabaseManager, 'get_source_id', lambda filename, location: 1)
+    session.clock = clock
+    return session
+
+
+def add_rows(writer, count):
+    errors = 0
+    for i in range(count):
+        try:
+            writer.add(filename='cam.mp4', location='Camara0', vehicle_type='car', confidence=0.9,
+                       timestamp=datetime(2024, 1, 1), processing_time=0.1, processed=True, bbox=[i, 0, i + 1, 1])
+        except RuntimeError:
+            errors += 1
+    return errors
+
+
+def test_failed_commit_keeps_rows(session):
+    writer = DetectionWriter(batch_size=2, flush_interval=1.0)
+    assert add_rows(writer, 2) == 1
+
+    assert len(writer.rows) == 2
+    assert writer.failed
+    assert writer.last_error == 'base de datos caída'
+    assert session.rollbacks == 1
+    assert writer.status()['pending'] == 2
+
+    session.fail = False
+    session.clock.now += 1.0
+    assert writer.flush_if_due() == 2
+    assert writer.rows == []
+    assert not writer.failed
+    assert writer.total_written == 2
+
+
+def test_retry_is_throttled_with_backoff(session):
+    writer = DetectionWriter(batch_size=2, flush_interval=1.0, max_backoff=4.0)
+    add_rows(writer, 2)
+    assert len(session.inserts) == 1
+
+    # Sin esperar el backoff, los add() siguientes no reintentan
+    assert add_rows(writer, 20) == 0
+    assert len(session.inserts) == 1
+
+    # Reintentos a 1 s, luego 2 s y luego el tope de 4 s
+    for delay in (1.0, 2.0, 4.0, 4.0):
+        session.clock.now += delay - 0.01
+        assert writer.flush_if_due() == 0
+        session.clock.now += 0.01
+        with pytest.raises(RuntimeError):
+            writer.flush_if_due()
+    assert len(session.inserts) == 5
+
+
+def test_buffer_is_bounded(session):
+    writer = DetectionWriter(batch_size=2, flush_interval=1.0, max_buffer=10)
+    add_rows(writer, 50)
+
+    assert len(writer.rows) == 10
+    assert writer.dropped == 40
+    # Se conservan las filas más recientes
+    assert writer.rows[-1]['x1'] == 49
+    assert writer.status()['dropped'] == 40
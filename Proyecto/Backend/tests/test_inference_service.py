@@ -0,0 +1,27 @@
+import pytest
+
+import InferenceService as service_module
+from InferenceService import InferenceService, InferenceUnavailable
+
+
+def test_failed_load_is_not_retried_during_cooldown(monkeypatch):
+    calls = []
+    clock = [100.0]
+
+    def failing_load_model(*args, **kwargs):
+        calls.append(args)
+        raise OSError('sin pesos')
+
+    monkeypatch.setattr(service_module, 'load_model', failing_load_model)
+    monkeypatch.setattr(service_module, 'monotonic', lambda: clock[0])
+    inference = InferenceService('modelo.pt', retry_after=30)
+
+    for _ in range(3):
+        with pytest.raises(InferenceUnavailable, match='sin pesos'):
+            inference.load()
+    assert len(calls) == 1
+
+    clock[0] += 30
+    with pytest.raises(InferenceUnavailable):
+        inference.load()
+    assert len(calls) == 2
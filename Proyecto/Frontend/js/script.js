@@ -4,9 +4,44 @@
         const socket = io();             // Asumiendo que ya tienes socket.io disponible
         let isStreaming = false;
         let currentIdCounter = 1;
+        let currentVideoJobId = null;    // Trabajo de video en segundo plano más reciente
+        let currentStreamId = null;      // Stream en vivo iniciado por este cliente
         let detectedObjects = [];        // Para el control de duplicados (streaming)
         const detectionTimeout = 3000;   // 3 segundos para limpiar detecciones antiguas
 
+        // Recibir los cuadros como JPEG binario (sin base64) y reducidos al ancho de la vista
+        const frameOptions = { mode: 'binary', quality: 75, max_width: 960 };
+        socket.on('connect', () => socket.emit('frame_options', frameOptions));
+
+        const frameUrls = {};            // URL de objeto vigente por elemento <img>
+
+        /**
+         * Muestra un cuadro recibido por Socket.IO en un elemento <img>.
+         * Acepta JPEG binario (ArrayBuffer) o el formato anterior en base64.
+         */
+        function showFrame(imgId, data) {
+            const img = document.getElementById(imgId);
+            if (typeof data.frame === 'string') {
+                img.src = 'data:image/jpeg;base64,' + data.frame;
+                return;
+            }
+            const url = URL.createObjectURL(new Blob([data.frame], { type: 'image/jpeg' }));
+            if (frameUrls[imgId]) URL.revokeObjectURL(frameUrls[imgId]);
+            frameUrls[imgId] = url;
+            img.src = url;
+        }
+
+        /**
+         * Convierte las detecciones compactas del modo binario
+         * ([id, etiqueta, confianza, x1, y1, x2, y2]) al formato de objetos.
+         */
+        function expandDetections(data) {
+            if (!data.detections || typeof data.frame === 'string') return data.detections;
+            return data.detections.map(([id, label, confidence, x1, y1, x2, y2]) => ({
+                id, label, confidence, bbox: [x1, y1, x2, y2]
+            }));
+        }
+
         // ============================
         // 2. Función de Previsualización
         // ============================
@@ -222,6 +257,13 @@ function resetCurrentTempIdCounter() {
                     headers: { 'Content-Type': 'multipart/form-data' },
                 });
 
+                // Los videos se procesan en segundo plano: el avance llega por 'job_progress'
+                if (response.data.job_id) {
+                    currentVideoJobId = response.data.job_id;
+                    alert(`Video en cola de procesamiento (trabajo ${response.data.job_id}).`);
+                    return;
+                }
+
                 const {
                     detections,
                     processed_image,
@@ -295,7 +337,12 @@ function resetCurrentTempIdCounter() {
         document.getElementById('startStream').addEventListener('click', () => {
             if (!isStreaming) {
                 isStreaming = true;
-                socket.emit('start_streaming');
+                // El servidor responde (ack) solo a este cliente con el identificador de su stream
+                socket.emit('start_streaming', {}, (reply) => {
+                    if (reply && reply.stream_id && isStreaming) {
+                        currentStreamId = reply.stream_id;
+                    }
+                });
                 console.log("Streaming iniciado");
 
                 // Limpiar tabla y contador
@@ -307,14 +354,17 @@ function resetCurrentTempIdCounter() {
 
                 // Suscribirse al evento 'frame' (llegan las imágenes en vivo)
                 socket.on('frame', (data) => {
+                    // Solo los cuadros del stream propio; mientras no se conoce su id, ninguno
+                    if (!currentStreamId || data.stream_id !== currentStreamId) return;
+
                     // Mostrar imagen en vivo
-                    const liveFrame = document.getElementById('liveFrame');
-                    liveFrame.src = 'data:image/jpeg;base64,' + data.frame;
+                    showFrame('liveFrame', data);
 
                     // Procesar detecciones en tiempo real
-                    if (data.detections) {
+                    const liveDetections = expandDetections(data);
+                    if (liveDetections) {
                         const now = Date.now();
-                        data.detections.forEach(detection => {
+                        liveDetections.forEach(detection => {
                             const bbox = detection.bbox || [0,0,0,0];
                             // Verificar duplicado
                             if (!isDuplicateDetection(detectedObjects, bbox, now, detectionTimeout)) {
@@ -345,7 +395,8 @@ function resetCurrentTempIdCounter() {
 
         document.getElementById('stopStream').addEventListener('click', () => {
             if (isStreaming) {
-                socket.emit('stop_stream');
+                socket.emit('stop_stream', currentStreamId ? { stream_id: currentStreamId } : {});
+                currentStreamId = null;
                 console.log("Evento 'stop_stream' emitido al servidor");
                 isStreaming = false;
 
@@ -362,13 +413,13 @@ function resetCurrentTempIdCounter() {
         //    - Solo si tu backend emite este evento con frames procesados
         // ============================
         socket.on('video_frame', (data) => {
-            const videoFrame = document.getElementById('videoFrame');
-            videoFrame.src = 'data:image/jpeg;base64,' + data.frame;
+            showFrame('videoFrame', data);
         
             // Asegurarse de que hay detecciones procesadas
-            if (data.detections) {
+            const videoDetections = expandDetections(data);
+            if (videoDetections) {
                 const now = Date.now();
-                data.detections.forEach(d => {
+                videoDetections.forEach(d => {
                     // Evitar duplicados
                     if (!isDuplicateDetection(detectedObjects, d.bbox, now, detectionTimeout)) {
                         detectedObjects.push({ bbox: d.bbox, timestamp: now });
@@ -399,6 +450,22 @@ function resetCurrentTempIdCounter() {
         });
         
         
+        // Avance de los trabajos de video en segundo plano
+        socket.on('job_progress', (job) => {
+            if (job.job_id !== currentVideoJobId) return;
+
+            const videoPreviewText = document.getElementById("videoPreviewText");
+            if (videoPreviewText) {
+                const progress = (job.progress !== null && job.progress !== undefined) ? ` ${job.progress}%` : '';
+                videoPreviewText.textContent = `Video ${job.filename || ''}: ${job.status}${progress}`;
+                videoPreviewText.style.display = "block";
+            }
+
+            if (job.status === 'failed') {
+                alert(`Error al procesar el video: ${job.error || 'Error desconocido'}`);
+            }
+        });
+
         // ============================
         // 9. Limpiar Tabla Actual
         // ============================